@@ -0,0 +1,94 @@
+"""Sample models, fake LLM responses and factories shared by the tests."""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, DeltaToolCalls, FunctionModel
+
+from weaver.core.data_generator import DataGenerator
+
+
+class User(BaseModel):
+    id: int
+    name: str
+
+
+class Product(BaseModel):
+    id: int
+
+
+class Author(BaseModel):
+    name: str
+
+
+class Publisher(BaseModel):
+    name: str
+
+
+class Tag(BaseModel):
+    label: str
+
+
+class Note(BaseModel):
+    text: str
+
+
+class Organization(BaseModel):
+    id: int
+    name: str
+    tag: Tag
+    tags: List[Tag]
+    note: Optional[Note] = None
+
+
+class Team(BaseModel):
+    organization: Organization
+
+
+class Profile(BaseModel):
+    id: int
+    tag: Optional[Tag] = None
+    tags: Optional[List[Tag]] = None
+    note: Note | None = None
+    labels: Dict[str, Tag] = {}
+
+
+class Account(BaseModel):
+    profile: Profile
+
+
+# Words counted by embed(), enough to tell the sample prompts apart
+EMBEDDING_VOCABULARY = ("young", "adult", "users", "senior", "people")
+
+
+def embed(text: str) -> List[float]:
+    """Embed text as bag-of-words counts over EMBEDDING_VOCABULARY."""
+    words = text.lower().split()
+    return [words.count(word) for word in EMBEDDING_VOCABULARY]
+
+
+def tool_response(info: AgentInfo, args: Dict[str, Any]) -> ModelResponse:
+    """Answer a tool-mode structured output request with args."""
+    return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+
+def items_response(info: AgentInfo, count: int) -> ModelResponse:
+    """Answer a batch request with count Product instances."""
+    return tool_response(info, {"items": [{"id": i} for i in range(count)]})
+
+
+def items_delta(info: AgentInfo, count: int) -> DeltaToolCalls:
+    """Stream a batch of count Product instances in a single tool-call delta."""
+    args = json.dumps({"items": [{"id": i} for i in range(count)]})
+    return {0: DeltaToolCall(name=info.output_tools[0].name, json_args=args)}
+
+
+def make_generator(function=None, stream_function=None, **kwargs: Any) -> DataGenerator:
+    """Build a DataGenerator answering through a scripted FunctionModel, with near-instant retries."""
+    generator = DataGenerator(
+        FunctionModel(function, stream_function=stream_function), "test", "test", **kwargs
+    )
+    generator.RETRY_BASE_DELAY = 0.001
+    return generator
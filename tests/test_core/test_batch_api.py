@@ -0,0 +1,118 @@
+"""Tests for the OpenAI Batch API request and output files."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from weaver.core.batch_api import BatchAPIRunner
+from weaver.exceptions import LLMProviderError
+
+from ..fixtures.models import Product, User
+
+
+class FakeClient:
+    """Records file deletions of an OpenAI client whose batches end with status."""
+
+    def __init__(self, status="completed", output=b""):
+        self.deleted = []
+        batch = SimpleNamespace(
+            id="batch", status=status, output_file_id="output" if status == "completed" else None,
+            error_file_id="errors"
+        )
+
+        async def create_file(file, purpose):
+            return SimpleNamespace(id="input")
+
+        async def create_batch(**kwargs):
+            return batch
+
+        async def content(file_id):
+            return SimpleNamespace(content=output)
+
+        async def delete(file_id):
+            self.deleted.append(file_id)
+
+        self.files = SimpleNamespace(create=create_file, content=content, delete=delete)
+        self.batches = SimpleNamespace(create=create_batch)
+
+
+def output_line(index, message, status_code=200):
+    return json.dumps({
+        "custom_id": f"req-{index}",
+        "response": {"status_code": status_code, "body": {"choices": [{"message": message}]}},
+    })
+
+
+@pytest.mark.parametrize("output_mode", BatchAPIRunner.OUTPUT_MODES)
+def test_build_jsonl_requests_the_output_mode(output_mode):
+    runner = BatchAPIRunner(None, "gpt-4o-mini", output_mode=output_mode)
+
+    lines = runner.build_jsonl([("system", "first", Product), ("system", "second", Product)]).splitlines()
+    requests = [json.loads(line) for line in lines]
+
+    assert [request["custom_id"] for request in requests] == ["req-0", "req-1"]
+    body = requests[1]["body"]
+    assert body["messages"][1] == {"role": "user", "content": "second"}
+    if output_mode == "native":
+        assert body["response_format"]["json_schema"]["name"] == "Product"
+        assert body["response_format"]["json_schema"]["strict"] is True
+        assert "tools" not in body
+    else:
+        assert body["tools"][0]["function"]["name"] == "Product"
+        assert body["tool_choice"]["function"]["name"] == "Product"
+        assert "response_format" not in body
+
+
+def test_native_schema_is_strict_compatible():
+    runner = BatchAPIRunner(None, "gpt-4o-mini", output_mode="native")
+
+    body = json.loads(runner.build_jsonl([("system", "users", User)]))["body"]
+    schema = body["response_format"]["json_schema"]["schema"]
+
+    assert schema["additionalProperties"] is False
+    assert sorted(schema["required"]) == sorted(schema["properties"])
+
+
+@pytest.mark.asyncio
+async def test_deletes_batch_files_after_parsing():
+    client = FakeClient(output=output_line(0, {"tool_calls": [{"function": {"arguments": '{"id": 7}'}}]}).encode())
+
+    result = await BatchAPIRunner(client, "gpt-4o-mini").arun([("system", "products", Product)])
+
+    assert result == [Product(id=7)]
+    assert sorted(client.deleted) == ["errors", "input", "output"]
+
+
+@pytest.mark.asyncio
+async def test_deletes_input_file_when_batch_fails():
+    client = FakeClient(status="failed")
+
+    with pytest.raises(LLMProviderError):
+        await BatchAPIRunner(client, "gpt-4o-mini").arun([("system", "products", Product)])
+    assert sorted(client.deleted) == ["errors", "input"]
+
+
+def test_rejects_unknown_output_mode():
+    with pytest.raises(ValueError):
+        BatchAPIRunner(None, "gpt-4o-mini", output_mode="auto")
+
+
+def test_parse_output_reads_tool_call_arguments_by_default():
+    content = "\n".join([
+        output_line(1, {"tool_calls": [{"function": {"arguments": '{"id": 1}'}}]}),
+        "",
+        output_line(0, {"tool_calls": [{"function": {"arguments": '{"id": 0}'}}]}),
+        output_line(2, {"content": None}, status_code=500),
+    ]).encode()
+
+    assert BatchAPIRunner.parse_output(content) == {0: '{"id": 0}', 1: '{"id": 1}'}
+
+
+def test_parse_output_skips_native_lines_without_content():
+    content = "\n".join([
+        output_line(0, {"content": '{"id": 0}'}),
+        output_line(1, {"content": None, "refusal": "no"}),
+    ]).encode()
+
+    assert BatchAPIRunner.parse_output(content, "native") == {0: '{"id": 0}'}
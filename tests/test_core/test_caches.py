@@ -0,0 +1,137 @@
+"""Tests for the in-memory, file, structural and semantic caches."""
+
+import json
+
+import pytest
+
+from weaver.cache import FileCache, MemoryCache, SemanticCache, StructuralCache
+from weaver.cache.structural_cache import REF_KEY, _named_candidate, _strip_id_suffix, _Templater
+from weaver.exceptions import CacheError
+
+from ..fixtures.models import embed
+
+
+class TestMemoryCache:
+    def test_evicts_least_recently_used(self):
+        cache = MemoryCache(max_size=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_expires_entries_after_ttl(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("weaver.cache.memory_cache.time.monotonic", lambda: now[0])
+        cache = MemoryCache(ttl=10)
+        cache.set("a", "1")
+
+        now[0] += 5
+        assert cache.get("a") == "1"
+        now[0] += 6
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_rejects_empty_size(self):
+        with pytest.raises(ValueError):
+            MemoryCache(max_size=0)
+
+
+class TestFileCache:
+    def test_round_trips_entries(self, tmp_path):
+        cache = FileCache(tmp_path)
+        cache.set("a", "1")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+
+    def test_removes_temporary_file_when_write_fails(self, tmp_path, monkeypatch):
+        def fail(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("weaver.cache.file_cache.os.replace", fail)
+
+        with pytest.raises(CacheError):
+            FileCache(tmp_path).set("a", "1")
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestStructuralCache:
+    REFERENCES = {"user": [{"id": 10, "name": "a"}, {"id": 20, "name": "b"}]}
+
+    @pytest.mark.parametrize("key, owner", [
+        ("user_id", "user"),
+        ("user_ids", "user"),
+        ("userId", "user"),
+        ("userIDs", "user"),
+        ("id", None),
+        ("_id", None),
+        ("identity", None),
+    ])
+    def test_strip_id_suffix(self, key, owner):
+        assert _strip_id_suffix(key) == owner
+
+    @pytest.mark.parametrize("owner, candidates, expected", [
+        ("user", [("user", 0)], "user/0"),
+        ("users", [("user", 1)], "user/1"),
+        ("Buyer_User", [("buyeruser", 0)], "buyeruser/0"),
+        ("user", [("order", 0)], None),
+        ("user", [("user", 0), ("user", 1)], None),
+        (None, [("user", 0)], None),
+    ])
+    def test_named_candidate(self, owner, candidates, expected):
+        assert _named_candidate(owner, candidates) == expected
+
+    def test_templates_references(self):
+        response = {"items": [
+            {"id": 1, "user_id": 20, "buyer": {"id": 10, "name": "a"}, "qty": 10},
+            {"id": 2, "user": {"id": 10, "note": "x"}},
+        ]}
+
+        templated = _Templater(self.REFERENCES).template(response)
+
+        assert templated == {"items": [
+            {"id": 1, "user_id": {REF_KEY: "user/1/id"}, "buyer": {REF_KEY: "user/0"}, "qty": 10},
+            {"id": 2, "user": {"id": {REF_KEY: "user/0/id"}, "note": "x"}},
+        ]}
+
+    def test_replays_with_new_references(self):
+        cache = StructuralCache()
+        response = {"items": [{"id": 1, "user_id": 20, "buyer": {"id": 10, "name": "a"}}]}
+        cache.set("k", json.dumps(response), self.REFERENCES)
+
+        rotated = {"user": [{"id": 77, "name": "x"}, {"id": 88, "name": "y"}]}
+        assert json.loads(cache.get("k", rotated)) == {
+            "items": [{"id": 1, "user_id": 88, "buyer": {"id": 77, "name": "x"}}]
+        }
+        assert cache.get("k", {"user": []}) is None
+
+    def test_keeps_ids_of_fields_not_named_after_a_dependency(self):
+        cache = StructuralCache()
+        cache.set("k", json.dumps({"id": 10, "product_id": 3, "user_id": 3}), {"user": [{"id": 3}]})
+
+        assert json.loads(cache.get("k", {"user": [{"id": 99}]})) == {"id": 10, "product_id": 3, "user_id": 99}
+
+    def test_keeps_ambiguous_references(self):
+        references = {"user": [{"id": 5}], "order": [{"id": 5}]}
+        cache = StructuralCache()
+        cache.set("k", json.dumps({"owner_id": 5}), references)
+
+        assert json.loads(cache.get("k", {"user": [{"id": 6}], "order": [{"id": 7}]})) == {"owner_id": 5}
+
+
+class TestSemanticCache:
+    def test_matches_similar_prompts_within_scope(self):
+        cache = SemanticCache(embed, threshold=0.9)
+        cache.set("scope", "young adult users", "value")
+
+        assert cache.get("scope", "Young adult users") == "value"
+        assert cache.get("scope", "senior people") is None
+        assert cache.get("other", "young adult users") is None
+
+    def test_rejects_invalid_threshold(self):
+        with pytest.raises(ValueError):
+            SemanticCache(embed, threshold=0)
@@ -0,0 +1,132 @@
+"""Tests for DataGenerator against scripted pydantic-ai FunctionModels."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError
+
+from weaver.cache import MemoryCache, SemanticCache
+from weaver.exceptions import WeaverError
+
+from ..fixtures.models import Product, embed, items_delta, items_response, make_generator, tool_response
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [ModelHTTPError(429, "test"), httpx.ConnectError("reset")])
+async def test_retries_transient_failures(error):
+    calls = []
+
+    async def flaky(messages, info):
+        calls.append(1)
+        if len(calls) < 3:
+            raise error
+        return tool_response(info, {"id": 1})
+
+    result = await make_generator(flaky).agenerate_independent(Product, "products", 1)
+
+    assert result == Product(id=1)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors():
+    calls = []
+
+    async def rejected(messages, info):
+        calls.append(1)
+        raise ModelHTTPError(400, "test")
+
+    with pytest.raises(WeaverError):
+        await make_generator(rejected).agenerate_independent(Product, "products", 1)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_caps_calls_in_flight():
+    state = {"in_flight": 0, "peak": 0}
+
+    async def slow(messages, info):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.02)
+        state["in_flight"] -= 1
+        return items_response(info, 1)
+
+    generator = make_generator(slow, batch_size=1, max_concurrency=3)
+    result = await generator.agenerate_independent(Product, "products", 9)
+
+    assert len(result) == 9
+    assert state["peak"] == 3
+
+
+@pytest.mark.asyncio
+async def test_times_out_slow_calls():
+    async def hang(messages, info):
+        await asyncio.sleep(1)
+
+    generator = make_generator(hang, timeout=0.05)
+
+    with pytest.raises(WeaverError, match=r"^LLM request timed out after 0.05 seconds$"):
+        await generator.agenerate_independent(Product, "products", 1)
+
+
+@pytest.mark.asyncio
+async def test_streams_items_of_every_chunk():
+    async def stream(messages, info):
+        yield items_delta(info, 3)
+
+    generator = make_generator(stream_function=stream, batch_size=3)
+    items = [item async for item in generator.aiter_independent(Product, "products", 5)]
+
+    assert len(items) == 5
+    assert all(isinstance(item, Product) for item in items)
+
+
+@pytest.mark.asyncio
+async def test_charges_estimated_prompt_tokens():
+    async def answer(messages, info):
+        return items_response(info, 1)
+
+    generator = make_generator(answer, batch_size=1, rate_limit_tpm=10 ** 6)
+    charged = []
+    acquire = generator.token_limiter.acquire
+
+    async def record(amount=1.0):
+        charged.append(amount)
+        await acquire(amount)
+
+    generator.token_limiter.acquire = record
+    await generator.agenerate_independent(Product, "products", 3)
+
+    assert len(charged) == 3
+    assert all(amount > 50 for amount in charged)
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_reuses_similar_prompts():
+    calls = []
+
+    async def answer(messages, info):
+        calls.append(1)
+        return items_response(info, 3)
+
+    embedded = []
+
+    def record(text):
+        embedded.append(threading.current_thread())
+        return embed(text)
+
+    generator = make_generator(
+        answer, cache=MemoryCache(), semantic_cache=SemanticCache(record, threshold=0.9)
+    )
+    first = await generator.agenerate_independent(Product, "young adult users", 3, use_cache=True)
+    second = await generator.agenerate_independent(Product, "Young adult users", 3, use_cache=True)
+    await generator.agenerate_independent(Product, "senior users", 3, use_cache=True)
+
+    assert first == second
+    assert len(calls) == 2
+    # Each new prompt is embedded once (the first one only when stored), off the event loop
+    assert len(embedded) == 3
+    assert threading.main_thread() not in embedded
@@ -0,0 +1,50 @@
+"""Tests for dependency detection, layering and correlation context."""
+
+from weaver.core.dependency_resolver import DependencyResolver
+
+from ..fixtures.models import Account, Note, Organization, Profile, Tag, Team
+
+
+def test_topological_layers_groups_independent_models():
+    models = {"tag": Tag, "note": Note, "organization": Organization, "team": Team}
+
+    layers = DependencyResolver.topological_layers(models)
+
+    assert layers == [["tag", "note"], ["organization"], ["team"]]
+
+
+def test_topological_layers_falls_back_to_input_order_on_cycles():
+    models = {"a": Tag, "b": Note, "c": Team}
+    adjacency = {"a": ["b"], "b": ["a"], "c": []}
+
+    layers = DependencyResolver.topological_layers(models, adjacency=adjacency)
+
+    assert layers == [["a"], ["b"], ["c"]]
+
+
+def test_correlation_context_keeps_short_nested_values():
+    organization = Organization(
+        id=1, name="acme", tag=Tag(label="x"), tags=[Tag(label="y")], note=Note(text="z" * 60)
+    )
+
+    context = "".join(DependencyResolver.iter_correlation_context(
+        Team, {"organization": [organization]}, ["organization"]
+    ))
+
+    assert "{'id': 1, 'name': 'acme', 'tag': {'label': 'x'}, 'tags': [{'label': 'y'}]}" in context
+    assert "zzz" not in context
+
+
+def test_correlation_context_dumps_optional_nested_models():
+    profile = Profile(
+        id=1, tag=Tag(label="x"), tags=[Tag(label="y")], note=Note(text="n"), labels={"k": Tag(label="z")}
+    )
+
+    context = "".join(DependencyResolver.iter_correlation_context(
+        Account, {"profile": [profile]}, ["profile"]
+    ))
+
+    assert (
+        "{'id': 1, 'tag': {'label': 'x'}, 'tags': [{'label': 'y'}], "
+        "'note': {'text': 'n'}, 'labels': {'k': {'label': 'z'}}}"
+    ) in context
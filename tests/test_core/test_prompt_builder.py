@@ -0,0 +1,23 @@
+"""Tests for prompt enhancement and its memoization."""
+
+from weaver.core.prompt_builder import PromptBuilder, _freeze_options
+
+from ..fixtures.models import User
+
+
+def test_freeze_options_keys_on_value_types():
+    assert _freeze_options({"diverse": True}) != _freeze_options({"diverse": 1})
+    assert _freeze_options({"age_range": (18, 65)}) != _freeze_options({"age_range": (18.0, 65)})
+    assert _freeze_options({"b": 1, "a": 2}) == _freeze_options({"a": 2, "b": 1})
+
+
+def test_freeze_options_gives_up_on_unhashable_values():
+    assert _freeze_options({"locales": ["en", "pt"]}) is None
+    assert _freeze_options(None) == ()
+
+
+def test_enhance_prompt_matches_unmemoized_build():
+    for options in ({"realistic": True}, {"age_range": (18, 65)}, {"locales": ["en"]}):
+        expected = PromptBuilder._build_enhanced_prompt("users", User, options)
+
+        assert PromptBuilder.enhance_prompt("users", User, options) == expected
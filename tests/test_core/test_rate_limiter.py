@@ -0,0 +1,36 @@
+"""Tests for the token-bucket rate limiter."""
+
+import time
+
+import pytest
+
+from weaver.core.rate_limiter import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_bursts_up_to_max_rate_then_waits():
+    limiter = RateLimiter(2, time_period=1.0)
+    start = time.monotonic()
+
+    for _ in range(2):
+        await limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+    await limiter.acquire()
+    assert time.monotonic() - start >= 0.4
+
+
+@pytest.mark.asyncio
+async def test_weighted_acquire_is_capped_at_max_rate():
+    limiter = RateLimiter(5, time_period=60.0)
+
+    # A single call larger than the whole budget must still go through
+    await limiter.acquire(10 ** 6)
+    assert limiter._tokens == 0
+
+
+def test_rejects_non_positive_rates():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+    with pytest.raises(ValueError):
+        RateLimiter(10, time_period=0)
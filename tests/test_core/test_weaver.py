@@ -0,0 +1,101 @@
+"""Tests for the Weaver entry points."""
+
+import asyncio
+
+import pytest
+from pydantic_ai.models.function import FunctionModel
+
+from weaver import Weaver, _loop
+from weaver.exceptions import WeaverError
+
+from ..fixtures.models import Author, Product, Publisher, items_delta, items_response, tool_response
+
+
+@pytest.mark.asyncio
+async def test_async_calls_run_on_the_background_loop():
+    loops = []
+
+    async def answer(messages, info):
+        loops.append(asyncio.get_running_loop())
+        return items_response(info, 2)
+
+    async def stream(messages, info):
+        loops.append(asyncio.get_running_loop())
+        yield items_delta(info, 2)
+
+    weaver = Weaver(provider=FunctionModel(answer, stream_function=stream), batch_size=2)
+    await weaver.agenerate(Product, count=2)
+    items = [item async for item in weaver.generate_iter(Product, count=2)]
+
+    assert len(items) == 2
+    assert len(loops) == 2
+    assert all(loop is _loop.get_loop() for loop in loops)
+
+
+@pytest.mark.asyncio
+async def test_generate_iter_rejects_several_models():
+    weaver = Weaver(provider=FunctionModel(lambda messages, info: None))
+
+    with pytest.raises(WeaverError, match="single model class"):
+        async for _ in weaver.generate_iter({"product": Product}):
+            pass
+
+
+def test_merged_layer_regenerates_empty_models():
+    prompts = []
+
+    async def answer(messages, info):
+        properties = info.output_tools[0].parameters_json_schema["properties"]
+        prompts.append(sorted(properties))
+        if "author" in properties:
+            return tool_response(info, {"author": [{"name": "a"}], "publisher": []})
+        return tool_response(info, {"name": "p"})
+
+    result = Weaver(provider=FunctionModel(answer)).generate({"author": Author, "publisher": Publisher})
+
+    assert result == {"author": Author(name="a"), "publisher": Publisher(name="p")}
+    assert prompts == [["author", "publisher"], ["name"]]
+
+
+@pytest.mark.filterwarnings("error")
+def test_layer_named_like_model_attributes_is_not_merged():
+    prompts = []
+
+    async def answer(messages, info):
+        prompts.append(sorted(info.output_tools[0].parameters_json_schema["properties"]))
+        return tool_response(info, {"name": "n"})
+
+    result = Weaver(provider=FunctionModel(answer)).generate({"model_config": Author, "schema": Publisher})
+
+    assert result == {"model_config": Author(name="n"), "schema": Publisher(name="n")}
+    assert prompts == [["name"], ["name"]]
+
+
+def test_from_config_follows_environment_key_rotation(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "first-key")
+    first = Weaver.from_config("openai")
+
+    assert Weaver.from_config("openai") is first
+    monkeypatch.setenv("OPENAI_API_KEY", "second-key")
+    assert Weaver.from_config("openai") is not first
+
+
+def test_format_results_json_layout():
+    items = [Product(id=1), Product(id=2)]
+
+    expected = "[\n" + ",\n".join(item.model_dump_json(indent=2) for item in items) + "\n]"
+    assert Weaver.format_results(items, "json") == expected
+    assert Weaver.format_results([], "json") == "[\n\n]"
+
+
+@pytest.mark.asyncio
+async def test_iterate_ends_when_the_stream_is_cancelled():
+    async def stream():
+        yield 1
+        raise asyncio.CancelledError
+
+    async def consume():
+        return [item async for item in _loop.iterate(stream())]
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(consume(), timeout=1)
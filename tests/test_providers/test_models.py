@@ -0,0 +1,18 @@
+"""Tests for provider model creation and the shared HTTP clients."""
+
+import pytest
+
+from weaver import Weaver
+from weaver.models import HTTPX_PROVIDERS, _PROVIDER_SDKS, _http_package, create_model
+
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("provider_name", sorted(HTTPX_PROVIDERS))
+def test_creates_every_httpx_provider(provider_name):
+    pytest.importorskip(_PROVIDER_SDKS[provider_name])
+
+    model = create_model(provider_name, api_key="test-key")
+    client = model.client._client
+
+    assert isinstance(client, _http_package(provider_name).AsyncClient)
+    assert Weaver(provider_name, api_key="test-key").model is not None
@@ -0,0 +1,148 @@
+"""Background event loop bridging Weaver's blocking API onto its async core."""
+
+import asyncio
+import os
+import sys
+import threading
+from typing import Any, AsyncIterator, Coroutine, Optional, TypeVar
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = sys.platform != "win32"
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+T = TypeVar("T")
+
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create an event loop for Weaver's own use, using uvloop when available.
+
+    Only loops owned by Weaver are affected; the global event loop policy is
+    left alone. Set WEAVER_NO_UVLOOP=1 to use the standard asyncio loop.
+    """
+    if UVLOOP_AVAILABLE and not os.environ.get("WEAVER_NO_UVLOOP"):
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the process-wide background event loop, starting it on first use.
+
+    The loop runs forever in a daemon thread, so pooled HTTP connections
+    (which are bound to the loop that opened them) survive between calls.
+    """
+    global _LOOP
+
+    with _LOOP_LOCK:
+        if _LOOP is None or _LOOP.is_closed():
+            _LOOP = new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="weaver-loop", daemon=True).start()
+        return _LOOP
+
+
+def is_started() -> bool:
+    """Return True if the background loop has been started and is still open."""
+    return _LOOP is not None and not _LOOP.is_closed()
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine on the background loop and block until it finishes.
+
+    Works the same with or without an event loop running in the calling
+    thread (scripts, notebooks, sync code inside async frameworks).
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait before cancelling it (waits indefinitely if not specified)
+
+    Raises:
+        TimeoutError: If the coroutine does not finish within timeout
+    """
+    loop = get_loop()
+
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot block Weaver's own event loop; await the coroutine instead")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+async def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Await a coroutine on the background loop from any event loop.
+
+    Pooled HTTP connections belong to the background loop, so coroutines
+    awaited from another loop are handed over to it instead of running on
+    the caller's loop. Cancelling the caller cancels the coroutine.
+
+    Args:
+        coro: Coroutine to run
+    """
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+async def iterate(stream: AsyncIterator[T]) -> AsyncIterator[T]:
+    """
+    Iterate an async generator on the background loop from any event loop.
+
+    Items are handed to the caller's loop as the background loop produces
+    them; the generator is cancelled if the caller stops iterating early.
+
+    Args:
+        stream: Async iterator to consume
+    """
+    loop = get_loop()
+    caller = asyncio.get_running_loop()
+    if caller is loop:
+        async for item in stream:
+            yield item
+        return
+
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+    done = object()
+
+    async def pump() -> None:
+        error: Optional[BaseException] = None
+        try:
+            async for item in stream:
+                caller.call_soon_threadsafe(queue.put_nowait, (item, None))
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception):
+                # Cancellation and exit requests must still end this task
+                raise
+        finally:
+            # Always end the stream, or the caller would wait on the queue forever
+            caller.call_soon_threadsafe(queue.put_nowait, (done, error))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        future.cancel()
@@ -0,0 +1,16 @@
+"""Caching backends for LLM generations."""
+
+from .base import CacheInterface, make_cache_key
+from .file_cache import FileCache
+from .memory_cache import MemoryCache
+from .semantic_cache import SemanticCache
+from .structural_cache import StructuralCache
+
+__all__ = [
+    "CacheInterface",
+    "FileCache",
+    "MemoryCache",
+    "SemanticCache",
+    "StructuralCache",
+    "make_cache_key",
+]
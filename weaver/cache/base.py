@@ -0,0 +1,49 @@
+"""Abstract cache interface for storing LLM generations."""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import Any, Optional
+
+
+class CacheInterface(ABC):
+    """Abstract base for all cache backends.
+
+    Backends store raw JSON strings under opaque string keys. Values are
+    revalidated against the Pydantic model when read back, so backends never
+    need to know about model classes.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store value under key."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        pass
+
+
+def make_cache_key(**parts: Any) -> str:
+    """Build a deterministic SHA-256 cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=_json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    # Read-only schema mappings serialize like the dicts they wrap
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
@@ -0,0 +1,92 @@
+"""File-based cache storing each entry as a JSON file."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from .base import CacheInterface
+from ..exceptions import CacheError
+
+DEFAULT_CACHE_DIR = "~/.cache/weaver"
+
+
+class FileCache(CacheInterface):
+    """Persistent cache keeping one file per entry in a cache directory.
+
+    Entries older than ``ttl`` seconds are treated as misses and removed.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR, ttl: Optional[float] = None):
+        """
+        Initialize the file cache.
+
+        Args:
+            cache_dir: Directory holding cache files (created on first write)
+            ttl: Entry lifetime in seconds (entries never expire if not specified)
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _is_expired(self, path: Path) -> bool:
+        return self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        path = self._path(key)
+        try:
+            if self._is_expired(path):
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise CacheError(f"Failed to read cache entry {key}: {str(e)}") from e
+
+    def set(self, key: str, value: str) -> None:
+        """Atomically write value under key."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(value)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                # Don't leave the partial write behind in the cache directory
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            raise CacheError(f"Failed to write cache entry {key}: {str(e)}") from e
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        try:
+            self._path(key).unlink(missing_ok=True)
+        except OSError as e:
+            raise CacheError(f"Failed to delete cache entry {key}: {str(e)}") from e
+
+    def clear(self) -> None:
+        """Remove every entry from the cache directory."""
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries and return how many were deleted."""
+        if self.ttl is None:
+            return 0
+
+        removed = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                if self._is_expired(path):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
@@ -0,0 +1,70 @@
+"""In-process LRU cache."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .base import CacheInterface
+
+DEFAULT_MAX_SIZE = 1024
+
+
+class MemoryCache(CacheInterface):
+    """Bounded in-memory cache evicting the least recently used entry.
+
+    Entries live only as long as the process. Useful for tests and for
+    repeated generations inside one notebook or script session.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: Optional[float] = None):
+        """
+        Initialize the memory cache.
+
+        Args:
+            max_size: Most entries kept before the least recently used is evicted
+            ttl: Entry lifetime in seconds (entries never expire if not specified)
+        """
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,163 @@
+"""Semantic cache reusing generations for near-duplicate prompts."""
+
+import asyncio
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_MAX_SIZE = 1024
+
+Embedding = Callable[[str], Sequence[float]]
+
+
+class SemanticCache:
+    """Cache matching prompts by embedding similarity instead of exact text.
+
+    Entries are grouped by scope (the exact key of everything but the prompt:
+    model, settings, schema, count...), and a lookup returns the stored value
+    of the most similar prompt in its scope when the cosine similarity reaches
+    the threshold. Prompts worded slightly differently thus share one
+    generation, so only use it where that is acceptable.
+
+    Any embedding function works, e.g. a local fastembed or
+    sentence-transformers model. It is called once per prompt not seen
+    verbatim before: lookups return the vector so the following store can
+    reuse it, and the async methods run it in a worker thread so a slow
+    embedder doesn't block the event loop.
+    """
+
+    def __init__(
+        self,
+        embed: Embedding,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_size: int = DEFAULT_MAX_SIZE
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            embed: Function returning the embedding vector of a prompt
+            threshold: Lowest cosine similarity counted as a hit (0 to 1)
+            max_size: Most entries kept before the least recently used is evicted
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+
+        self.embed = embed
+        self.threshold = threshold
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[List[float], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope: str, prompt: str) -> Optional[str]:
+        """
+        Return the value stored for the most similar prompt in scope.
+
+        Args:
+            scope: Cache key of the request without its prompt
+            prompt: Prompt to match
+
+        Returns:
+            Cached value, or None if no prompt in scope is similar enough
+        """
+        return self.lookup(scope, prompt)[0]
+
+    def lookup(self, scope: str, prompt: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """
+        Like get, but also return the prompt's embedding if one was computed.
+
+        Pass the vector on to set after a miss so the prompt is not embedded twice.
+
+        Returns:
+            (cached value or None, prompt embedding or None)
+        """
+        found, value = self._get_exact(scope, prompt)
+        if found:
+            return value, None
+
+        vector = _normalize(self.embed(prompt))
+        return self._get_nearest(scope, vector), vector
+
+    async def alookup(self, scope: str, prompt: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """Async version of `lookup`, embedding the prompt in a worker thread."""
+        found, value = self._get_exact(scope, prompt)
+        if found:
+            return value, None
+
+        vector = _normalize(await asyncio.to_thread(self.embed, prompt))
+        return self._get_nearest(scope, vector), vector
+
+    def set(self, scope: str, prompt: str, value: str, vector: Optional[List[float]] = None) -> None:
+        """
+        Store value for a prompt, evicting the least recently used entry if full.
+
+        Args:
+            scope: Cache key of the request without its prompt
+            prompt: Prompt the value was generated for
+            value: Response JSON
+            vector: Prompt embedding returned by lookup (computed if not specified)
+        """
+        if vector is None:
+            vector = self._stored_vector(scope, prompt) or _normalize(self.embed(prompt))
+        self._store(scope, prompt, value, vector)
+
+    async def aset(self, scope: str, prompt: str, value: str, vector: Optional[List[float]] = None) -> None:
+        """Async version of `set`, embedding the prompt in a worker thread if needed."""
+        if vector is None:
+            vector = self._stored_vector(scope, prompt) or _normalize(await asyncio.to_thread(self.embed, prompt))
+        self._store(scope, prompt, value, vector)
+
+    def _get_exact(self, scope: str, prompt: str) -> Tuple[bool, Optional[str]]:
+        # (True, value) on a verbatim hit, and (True, None) when nothing in
+        # scope could match, so the prompt need not be embedded
+        with self._lock:
+            entry = self._entries.get((scope, prompt))
+            if entry is not None:
+                self._entries.move_to_end((scope, prompt))
+                return True, entry[1]
+            return not any(key[0] == scope for key in self._entries), None
+
+    def _get_nearest(self, scope: str, vector: List[float]) -> Optional[str]:
+        with self._lock:
+            best_key, best_score = None, self.threshold
+            for key, (stored, _) in self._entries.items():
+                if key[0] != scope:
+                    continue
+                score = sum(a * b for a, b in zip(vector, stored))
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][1]
+
+    def _stored_vector(self, scope: str, prompt: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get((scope, prompt))
+        return entry[0] if entry is not None else None
+
+    def _store(self, scope: str, prompt: str, value: str, vector: List[float]) -> None:
+        with self._lock:
+            self._entries[(scope, prompt)] = (vector, value)
+            self._entries.move_to_end((scope, prompt))
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    # Unit vectors make the dot product the cosine similarity
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else [float(x) for x in vector]
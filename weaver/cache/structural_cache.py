@@ -0,0 +1,152 @@
+"""Structural cache reusing correlated generations across rotating IDs."""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import CacheInterface
+from .memory_cache import MemoryCache
+
+# Placeholder left in a templated response where a dependency was referenced:
+# {"$ref": "user/0"} is the whole instance, {"$ref": "user/0/id"} its ID
+REF_KEY = "$ref"
+
+References = Dict[str, List[Dict[str, Any]]]
+
+
+class StructuralCache:
+    """Cache for correlated generations keyed on request shape, not on the referenced data.
+
+    A correlated request whose dependency instances differ only in their values
+    (new IDs, names, ...) maps to the same entry. Responses are stored with
+    every reference to a dependency instance replaced by a placeholder, and the
+    placeholders are filled from the current dependency instances on a hit.
+
+    Recognised references are nested objects equal to a dependency instance,
+    ``id`` fields of objects nested under a dependency's name, and
+    ``<dependency>_id`` / ``<dependency>_ids`` fields. Any other value,
+    including IDs in fields not named after a dependency, is replayed as-is,
+    so this suits deterministic (temperature 0) setups where a fresh call
+    would repeat them.
+    """
+
+    def __init__(self, cache: Optional[CacheInterface] = None):
+        """
+        Initialize the structural cache.
+
+        Args:
+            cache: Backend holding the templated responses (defaults to a MemoryCache)
+        """
+        self.cache = cache if cache is not None else MemoryCache()
+
+    def get(self, key: str, references: References) -> Optional[str]:
+        """
+        Return the cached response for key with placeholders filled from references.
+
+        Args:
+            key: Structural cache key of the request
+            references: Dumped dependency instances by name, in the order shown to the LLM
+
+        Returns:
+            Response JSON, or None on a miss or if a placeholder has no matching instance
+        """
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+
+        try:
+            return json.dumps(_fill(json.loads(cached), references))
+        except (LookupError, ValueError):
+            return None
+
+    def set(self, key: str, value: str, references: References) -> None:
+        """
+        Store a response under key with its dependency references templated out.
+
+        Args:
+            key: Structural cache key of the request
+            value: Response JSON
+            references: Dumped dependency instances by name, in the order shown to the LLM
+        """
+        templated = _Templater(references).template(json.loads(value))
+        self.cache.set(key, json.dumps(templated))
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        self.cache.clear()
+
+
+class _Templater:
+    """Replaces references to dependency instances in a response with placeholders."""
+
+    def __init__(self, references: References):
+        self.instances: Dict[str, str] = {}
+        self.ids: Dict[Any, List[Tuple[str, int]]] = {}
+
+        for dep_name, instances in references.items():
+            for index, instance in enumerate(instances):
+                self.instances.setdefault(_canonical(instance), f"{dep_name}/{index}")
+                instance_id = instance.get("id")
+                if _is_id_value(instance_id):
+                    self.ids.setdefault(instance_id, []).append((dep_name, index))
+
+    def template(self, node: Any, key: Optional[str] = None, parent: Optional[str] = None) -> Any:
+        if isinstance(node, dict):
+            ref = self.instances.get(_canonical(node))
+            if ref is not None:
+                return {REF_KEY: ref}
+            return {k: self.template(v, k, key) for k, v in node.items()}
+
+        if isinstance(node, list):
+            return [self.template(item, key, parent) for item in node]
+
+        if key is None or not _is_id_value(node) or node not in self.ids:
+            return node
+
+        candidates = self.ids[node]
+        if key == "id":
+            # An object's own "id" is only a reference when nested under a dependency
+            ref = _named_candidate(parent, candidates)
+            return node if ref is None else {REF_KEY: f"{ref}/id"}
+
+        # Foreign keys are only references when named after the dependency
+        ref = _named_candidate(_strip_id_suffix(key), candidates)
+        return node if ref is None else {REF_KEY: f"{ref}/id"}
+
+
+def _fill(node: Any, references: References) -> Any:
+    if isinstance(node, dict):
+        if len(node) == 1 and REF_KEY in node:
+            dep_name, index, *field = node[REF_KEY].split("/")
+            instance = references[dep_name][int(index)]
+            return instance[field[0]] if field else instance
+        return {k: _fill(v, references) for k, v in node.items()}
+
+    if isinstance(node, list):
+        return [_fill(item, references) for item in node]
+
+    return node
+
+
+def _named_candidate(owner: Optional[str], candidates: List[Tuple[str, int]]) -> Optional[str]:
+    """Return the placeholder path of the only candidate named like owner, if any."""
+    if owner is None:
+        return None
+
+    owner = owner.replace("_", "").lower()
+    named = [c for c in candidates if owner in (c[0], f"{c[0]}s")]
+    return "%s/%d" % named[0] if len(named) == 1 else None
+
+
+def _canonical(node: Dict[str, Any]) -> str:
+    return json.dumps(node, sort_keys=True)
+
+
+def _is_id_value(value: Any) -> bool:
+    return isinstance(value, (int, str)) and not isinstance(value, bool)
+
+
+def _strip_id_suffix(key: str) -> Optional[str]:
+    for suffix in ("_ids", "Ids", "IDs", "_id", "Id", "ID"):
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[: -len(suffix)]
+    return None
@@ -1,45 +1,224 @@
 """Data generation module handling LLM interactions and batch processing."""
 
 import asyncio
-from typing import Type, List, Dict, Any, Union
-from pydantic import BaseModel, create_model as pydantic_create_model
-from pydantic_ai import Agent
+import random
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+from typing import Type, List, Dict, Any, Union, Optional, Coroutine, TypeVar, AsyncIterator, Tuple, Callable
+
+import httpx
+from pydantic import BaseModel, ValidationError as PydanticValidationError, create_model as pydantic_create_model
+from pydantic_ai import Agent, NativeOutput
+from pydantic_ai.exceptions import ModelHTTPError
 
 from .dependency_resolver import DependencyResolver
 from .prompt_builder import PromptBuilder
+from .schema_converter import SchemaConverter
+from .batch_api import BatchAPIRunner
+from .rate_limiter import RateLimiter
+from .. import _loop
+from ..cache import CacheInterface, FileCache, SemanticCache, StructuralCache, make_cache_key
 from ..exceptions import WeaverError
 
+T = TypeVar("T")
+
+# Queue marker sent when one streamed chunk has finished
+_CHUNK_DONE = object()
+
+
+@lru_cache(maxsize=256)
+def _batch_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Build the wrapper model used to request a list of instances in one call."""
+    return pydantic_create_model(
+        f"Batch{model.__name__}",
+        items=(List[model], ...)
+    )
+
+
+def _is_field_name(name: str) -> bool:
+    """Check whether a model name can become a field of a merged wrapper model."""
+    # BaseModel attributes (model_config, json, schema, ...) would be shadowed
+    # or break model creation, and model_ is pydantic's protected namespace
+    return (
+        name.isidentifier()
+        and not name.startswith(("_", "model_"))
+        and not hasattr(BaseModel, name)
+    )
+
+
+@lru_cache(maxsize=256)
+def _merged_model(members: Tuple[Tuple[str, Type[BaseModel]], ...]) -> Type[BaseModel]:
+    """Build the wrapper model used to request several independent models in one call."""
+    return pydantic_create_model(
+        "Batch" + "".join(model.__name__ for _, model in members),
+        **{name: (List[model], ...) for name, model in members}
+    )
+
+
+@lru_cache(maxsize=256)
+def _cost_factors(model_class: Type[BaseModel]) -> Tuple[int, int]:
+    """Return the (dependency count, field count) behind a model's cost estimate."""
+    return len(DependencyResolver.extract_dependency_names(model_class)), len(model_class.model_fields)
+
+
+def _transport_errors() -> Tuple[type, ...]:
+    """Return the connection-level error classes worth retrying (SDKs are only checked if imported)."""
+    errors = [httpx.TransportError]
+    for name in ("openai", "anthropic"):
+        error = getattr(sys.modules.get(name), "APIConnectionError", None)
+        if error is not None:
+            errors.append(error)
+    return tuple(errors)
+
 
 class DataGenerator:
     """Handles the actual data generation using LLM agents."""
     
-    def __init__(self, model, model_name: str, provider_name: str):
+    # Default largest number of instances requested from the LLM in a single
+    # call; bigger counts are split into chunks that are generated concurrently.
+    DEFAULT_BATCH_SIZE = 10
+    
+    # Seconds a single LLM call may take before it is cancelled (None disables)
+    DEFAULT_TIMEOUT = 60.0
+    
+    # Most independent models requested together in one merged call; larger
+    # layers, or counts above batch_size, fall back to one call per model.
+    MAX_MERGED_MODELS = 4
+    
+    # Most agents kept for reuse, one per distinct system prompt
+    MAX_CACHED_AGENTS = 256
+    
+    # Default cap on LLM calls in flight at once per event loop
+    DEFAULT_MAX_CONCURRENCY = 50
+    
+    # Backoff on rate limits (HTTP 429), transient server errors and failed
+    # connections: up to MAX_RATE_LIMIT_RETRIES retries, with full-jitter
+    # delays growing from RETRY_BASE_DELAY up to RETRY_MAX_DELAY seconds
+    RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+    MAX_RATE_LIMIT_RETRIES = 5
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    
+    # Rough prompt size estimate used by the tokens-per-minute limit
+    CHARS_PER_TOKEN = 4
+    
+    # How structured output is requested: "tool" a forced tool call (works
+    # with every provider), "native" the provider's JSON schema response
+    # format. Native is opt-in because model profiles do not reliably tell
+    # whether a model accepts json_schema responses (pydantic-ai marks
+    # OpenAI models such as gpt-4-turbo that reject them as supported).
+    OUTPUT_MODES = ("native", "tool")
+    
+    def __init__(
+        self,
+        model,
+        model_name: str,
+        provider_name: str,
+        cache: Optional[CacheInterface] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        output_mode: str = "tool",
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate_limit_rpm: Optional[float] = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        structural_cache: Optional[StructuralCache] = None,
+        rate_limit_tpm: Optional[float] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
         """Initialize the data generator with model configuration."""
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError(f"output_mode must be one of {self.OUTPUT_MODES}, got {output_mode!r}")
+        
         self.model = model
         self.model_name = model_name
         self.provider_name = provider_name
+        self.cache = cache
+        # Consulted before the exact cache for correlated requests with use_cache=True
+        self.structural_cache = structural_cache
+        # Consulted before the exact cache for independent requests with use_cache=True
+        self.semantic_cache = semantic_cache
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.output_mode = output_mode
+        
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = RateLimiter(rate_limit_rpm) if rate_limit_rpm else None
+        # Budgets estimated prompt tokens only; completions are not known up front
+        self.token_limiter = RateLimiter(rate_limit_tpm) if rate_limit_tpm else None
+        # Agents hold no per-run state, so one per (system prompt, output type)
+        # is reused across calls (least recently used evicted beyond MAX_CACHED_AGENTS).
+        # Binding the output type at construction lets pydantic-ai build its
+        # output validator once instead of on every run.
+        self._agents: "OrderedDict[Tuple[str, Type[BaseModel]], Agent]" = OrderedDict()
+        self._agents_lock = threading.Lock()
+        # asyncio.Semaphore binds to the loop that first waits on it, and
+        # blocking calls may run on different loops, so keep one per loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
     
     def generate_independent(
         self, 
         model_class: Type[BaseModel], 
         prompt: str, 
-        count: int
+        count: int,
+        use_cache: bool = False
     ) -> Union[BaseModel, List[BaseModel]]:
         """Generate data for models without dependencies."""
+        return self.run_sync(self.agenerate_independent(model_class, prompt, count, use_cache))
+    
+    async def agenerate_independent(
+        self, 
+        model_class: Type[BaseModel], 
+        prompt: str, 
+        count: int,
+        use_cache: bool = False
+    ) -> Union[BaseModel, List[BaseModel]]:
+        """Async version of `generate_independent`."""
         
         system_prompt = PromptBuilder.build_independent_system_prompt(model_class)
         
-        agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            retries=3,
-        )
+        semantic_scope = prompt_vector = None
+        if use_cache and self.semantic_cache is not None:
+            semantic_scope = self._semantic_scope(system_prompt, model_class, count)
+            cached, prompt_vector = await self.semantic_cache.alookup(semantic_scope, prompt)
+            if cached is not None:
+                try:
+                    return self._load_result(model_class, count, cached)
+                except PydanticValidationError:
+                    pass
         
         if count == 1:
-            result = self._run_agent(agent, prompt, model_class)
-            return result.output
+            result = await self._arun_agent(system_prompt, prompt, model_class, use_cache)
         else:
-            return self._generate_batch(agent, model_class, prompt, count)
+            result = await self._agenerate_batch(system_prompt, model_class, prompt, count, use_cache)
+        
+        if semantic_scope is not None:
+            await self.semantic_cache.aset(
+                semantic_scope, prompt, self._dump_result(model_class, count, result), prompt_vector
+            )
+        
+        return result
+    
+    def _semantic_scope(self, system_prompt: str, model_class: Type[BaseModel], count: int) -> str:
+        """Build the semantic cache scope: the exact cache key of a request minus its prompt."""
+        
+        return make_cache_key(
+            kind="semantic",
+            provider=self.provider_name,
+            model=self.model_name,
+            settings=getattr(self.model, "settings", None),
+            system_prompt=system_prompt,
+            count=count,
+            schema=SchemaConverter.schema_fingerprint(model_class),
+        )
     
     def generate_with_correlations(
         self, 
@@ -47,92 +226,545 @@ class DataGenerator:
         prompt: str, 
         count: int,
         generated_pool: Dict[str, Any],
-        dependencies: List[str]
+        dependencies: List[str],
+        use_cache: bool = False
     ) -> Union[BaseModel, List[BaseModel]]:
         """Generate data that correlates with previously generated data."""
+        return self.run_sync(self.agenerate_with_correlations(
+            model_class, prompt, count, generated_pool, dependencies, use_cache
+        ))
+    
+    async def agenerate_with_correlations(
+        self, 
+        model_class: Type[BaseModel], 
+        prompt: str, 
+        count: int,
+        generated_pool: Dict[str, Any],
+        dependencies: List[str],
+        use_cache: bool = False
+    ) -> Union[BaseModel, List[BaseModel]]:
+        """Async version of `generate_with_correlations`."""
         
-        # Build context with available dependency data
-        correlation_context = DependencyResolver.build_correlation_context(
-            model_class, generated_pool, dependencies
-        )
+        structural_key = references = None
+        if use_cache and self.structural_cache is not None:
+            structural_key, references = self._structural_request(
+                model_class, prompt, count, generated_pool, dependencies
+            )
+            cached = self.structural_cache.get(structural_key, references)
+            if cached is not None:
+                try:
+                    return self._load_result(model_class, count, cached)
+                except PydanticValidationError:
+                    pass
         
-        enhanced_prompt = PromptBuilder.build_correlation_prompt(
-            model_class, prompt, correlation_context
+        system_prompt, enhanced_prompt = PromptBuilder.build_correlation_request(
+            model_class, prompt, generated_pool, dependencies
         )
         
-        system_prompt = PromptBuilder.build_system_prompt(
-            model_class, has_correlations=True
-        )
+        if count == 1:
+            result = await self._arun_agent(system_prompt, enhanced_prompt, model_class, use_cache)
+        else:
+            result = await self._agenerate_batch(
+                system_prompt, model_class, enhanced_prompt, count, use_cache
+            )
         
-        agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            retries=3,
+        if structural_key is not None:
+            self.structural_cache.set(structural_key, self._dump_result(model_class, count, result), references)
+        
+        return result
+    
+    def _structural_request(
+        self,
+        model_class: Type[BaseModel],
+        prompt: str,
+        count: int,
+        generated_pool: Dict[str, Any],
+        dependencies: List[str]
+    ) -> Tuple[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Build the structural cache key and references of a correlated request.
+        
+        The key covers everything but the dependency values: the request, the
+        schemas involved and how many instances of each dependency are shown.
+        References are the dumped instances shown in the correlation context.
+        """
+        
+        references = {}
+        shape = []
+        for dep_name in sorted(dependencies):
+            if dep_name not in generated_pool:
+                continue
+            dep_data = generated_pool[dep_name]
+            instances = list(islice(
+                dep_data if isinstance(dep_data, list) else [dep_data],
+                DependencyResolver.MAX_CONTEXT_INSTANCES
+            ))
+            references[dep_name] = [instance.model_dump(mode="json") for instance in instances]
+            shape.append([
+                dep_name,
+                SchemaConverter.schema_fingerprint(type(instances[0])) if instances else None,
+                len(instances),
+            ])
+        
+        key = make_cache_key(
+            kind="structural",
+            provider=self.provider_name,
+            model=self.model_name,
+            settings=getattr(self.model, "settings", None),
+            system_prompt=PromptBuilder.build_system_prompt(model_class, has_correlations=True),
+            prompt=prompt,
+            count=count,
+            schema=SchemaConverter.schema_fingerprint(model_class),
+            dependencies=shape,
         )
+        return key, references
+    
+    @staticmethod
+    def _load_result(
+        model_class: Type[BaseModel],
+        count: int,
+        data: str
+    ) -> Union[BaseModel, List[BaseModel]]:
+        """Validate a cached result stored by _dump_result."""
         
         if count == 1:
-            result = self._run_agent(agent, enhanced_prompt, model_class)
-            return result.output
-        else:
-            return self._generate_batch(agent, model_class, enhanced_prompt, count)
+            return model_class.model_validate_json(data)
+        return _batch_model(model_class).model_validate_json(data).items
+    
+    @staticmethod
+    def _dump_result(
+        model_class: Type[BaseModel],
+        count: int,
+        result: Union[BaseModel, List[BaseModel]]
+    ) -> str:
+        """Serialize a generation result for caching."""
+        
+        if count == 1:
+            return result.model_dump_json()
+        return _batch_model(model_class)(items=result).model_dump_json()
+    
+    async def aiter_independent(
+        self,
+        model_class: Type[BaseModel],
+        prompt: str,
+        count: int,
+        use_cache: bool = False
+    ) -> AsyncIterator[BaseModel]:
+        """Yield instances of an independent model as each batch chunk completes."""
+        
+        system_prompt = PromptBuilder.build_independent_system_prompt(model_class)
+        async for item in self._aiter_generate(system_prompt, model_class, prompt, count, use_cache):
+            yield item
+    
+    async def aiter_with_correlations(
+        self,
+        model_class: Type[BaseModel],
+        prompt: str,
+        count: int,
+        generated_pool: Dict[str, Any],
+        dependencies: List[str],
+        use_cache: bool = False
+    ) -> AsyncIterator[BaseModel]:
+        """Yield correlated instances as each batch chunk completes."""
+        
+        system_prompt, enhanced_prompt = PromptBuilder.build_correlation_request(
+            model_class, prompt, generated_pool, dependencies
+        )
+        async for item in self._aiter_generate(
+            system_prompt, model_class, enhanced_prompt, count, use_cache
+        ):
+            yield item
     
     def generate_related_data(
         self,
         models: Dict[str, Type[BaseModel]],
         prompts: Dict[str, str],
-        count: int = 1
+        count: int = 1,
+        use_cache: bool = False
     ) -> Dict[str, Union[BaseModel, List[BaseModel]]]:
         """Generate related data for multiple models with real correlations."""
+        return self.run_sync(self.agenerate_related_data(models, prompts, count, use_cache))
+    
+    async def agenerate_related_data(
+        self,
+        models: Dict[str, Type[BaseModel]],
+        prompts: Dict[str, str],
+        count: int = 1,
+        use_cache: bool = False
+    ) -> Dict[str, Union[BaseModel, List[BaseModel]]]:
+        """Async version of `generate_related_data`."""
         
         try:
-            # Sort models by dependency order (topological sort)
-            ordered_models = DependencyResolver.topological_sort(models)
+            # Resolve the dependency graph once for ordering and correlation lookups
+            graph = DependencyResolver.build_dependency_graph(models)
+            
+            # Models in the same dependency layer are generated concurrently
+            layers = DependencyResolver.topological_layers(models, adjacency=graph)
             
             results = {}
             generated_pool = {}  # Pool of all generated instances by model type
             
-            for model_name in ordered_models:
-                model_class = models[model_name]
-                prompt = prompts.get(model_name, f"Generate realistic {model_name} data")
-                
-                # Check if this model has dependencies
-                dependencies = DependencyResolver.extract_dependency_names(model_class)
-                available_deps = [dep for dep in dependencies if dep in generated_pool]
+            for layer in layers:
+                if self._can_merge_layer(layer, graph, count):
+                    generated = await self._agenerate_merged_layer(
+                        {name: models[name] for name in layer}, prompts, count, use_cache
+                    )
+                    results.update(generated)
+                    generated_pool.update(generated)
+                    continue
                 
-                if not available_deps:
-                    # No dependencies - generate independently
-                    generated = self.generate_independent(model_class, prompt, count)
-                else:
-                    # Has dependencies - generate with valid correlations  
-                    generated = self.generate_with_correlations(
-                        model_class, prompt, count, generated_pool, available_deps
+                generated_layer = await asyncio.gather(*(
+                    self._agenerate_related_model(
+                        models[model_name],
+                        prompts.get(model_name, f"Generate realistic {model_name} data"),
+                        count, generated_pool, graph[model_name], use_cache
                     )
+                    for model_name in layer
+                ), return_exceptions=True)
                 
-                results[model_name] = generated
-                generated_pool[model_name] = generated
+                for model_name, generated in zip(layer, generated_layer):
+                    if isinstance(generated, BaseException):
+                        raise generated
+                    results[model_name] = generated
+                    generated_pool[model_name] = generated
                 
             return results
             
+        except WeaverError:
+            raise
         except Exception as e:
             raise WeaverError(f"Related generation failed: {str(e)}") from e
     
-    def _generate_batch(
+    def _can_merge_layer(
+        self,
+        layer: List[str],
+        graph: Dict[str, List[str]],
+        count: int
+    ) -> bool:
+        """Check whether a layer can be generated with one merged LLM call."""
+        
+        return (
+            1 < len(layer) <= self.MAX_MERGED_MODELS
+            and count <= self.batch_size
+            # Merged models become fields of the wrapper, so names must be usable as field names
+            and all(_is_field_name(name) for name in layer)
+            # Only models that need no correlation context can share a call
+            and not any(graph[name] for name in layer)
+        )
+    
+    async def _agenerate_merged_layer(
+        self,
+        layer_models: Dict[str, Type[BaseModel]],
+        prompts: Dict[str, str],
+        count: int,
+        use_cache: bool = False
+    ) -> Dict[str, Union[BaseModel, List[BaseModel]]]:
+        """Generate several independent models with a single LLM call."""
+        
+        MergedModel = _merged_model(tuple(layer_models.items()))
+        
+        system_prompt = "\n\n".join(
+            f"## {name}\n{PromptBuilder.build_independent_system_prompt(model_class)}"
+            for name, model_class in layer_models.items()
+        )
+        
+        sections = [
+            f"""## {name}
+Generate exactly {count} different, varied instances of {model_class.__name__} in the '{name}' array.
+{prompts.get(name, f"Generate realistic {name} data")}"""
+            for name, model_class in layer_models.items()
+        ]
+        merged_prompt = (
+            "Generate data for each of the following models and return it in the matching field.\n\n"
+            + "\n\n".join(sections)
+        )
+        
+        output = await self._arun_agent(system_prompt, merged_prompt, MergedModel, use_cache)
+        
+        results = {}
+        missing = []
+        for name in layer_models:
+            items = getattr(output, name)[:count]
+            if not items:
+                missing.append(name)
+                continue
+            results[name] = items[0] if count == 1 else items
+        
+        # A model the merged response left empty gets a call of its own
+        generated = await asyncio.gather(*(
+            self.agenerate_independent(
+                layer_models[name], prompts.get(name, f"Generate realistic {name} data"), count, use_cache
+            )
+            for name in missing
+        ))
+        results.update(zip(missing, generated))
+        return results
+    
+    async def _agenerate_related_model(
+        self,
+        model_class: Type[BaseModel],
+        prompt: str,
+        count: int,
+        generated_pool: Dict[str, Any],
+        dependencies: List[str],
+        use_cache: bool = False
+    ) -> Union[BaseModel, List[BaseModel]]:
+        """Generate one model of a related set against the dependencies generated so far."""
+        
+        # Check if this model has dependencies
+        available_deps = [dep for dep in dependencies if dep in generated_pool]
+        
+        if not available_deps:
+            # No dependencies - generate independently
+            return await self.agenerate_independent(model_class, prompt, count, use_cache)
+        
+        # Has dependencies - generate with valid correlations
+        return await self.agenerate_with_correlations(
+            model_class, prompt, count, generated_pool, available_deps, use_cache
+        )
+    
+    async def agenerate_batch_api(
+        self,
+        model_class: Type[BaseModel],
+        prompt: str,
+        count: int,
+        generated_pool: Optional[Dict[str, Any]] = None,
+        dependencies: Optional[List[str]] = None,
+        poll_interval: float = 30.0,
+        on_progress: Optional[Callable[[Any], None]] = None,
+        use_cache: bool = False
+    ) -> List[BaseModel]:
+        """
+        Generate a batch through the OpenAI Batch API, one request per chunk.
+        
+        Results arrive only when the whole batch completes (up to 24h), at
+        half the cost of regular requests. With use_cache, chunks already in
+        the cache are left out of the batch and new outputs are stored.
+        """
+        
+        if self.provider_name != "openai" or not hasattr(getattr(self.model, "client", None), "batches"):
+            raise WeaverError(f"Batch mode requires the openai provider, got '{self.provider_name}'")
+        
+        if dependencies:
+            system_prompt, prompt = PromptBuilder.build_correlation_request(
+                model_class, prompt, generated_pool, dependencies
+            )
+        else:
+            system_prompt = PromptBuilder.build_independent_system_prompt(model_class)
+        
+        BatchModel = _batch_model(model_class)
+        offsets = range(0, count, self.batch_size)
+        chunk_sizes = [min(self.batch_size, count - offset) for offset in offsets]
+        requests = [
+            (
+                system_prompt,
+                self._build_chunk_prompt(
+                    model_class, prompt, size, offset if len(offsets) > 1 else None
+                ),
+                BatchModel,
+            )
+            for offset, size in zip(offsets, chunk_sizes)
+        ]
+        
+        lookups = [self._cache_lookup(*request, use_cache) for request in requests]
+        pending = [i for i, (_, cached) in enumerate(lookups) if cached is None]
+        outputs = [cached for _, cached in lookups]
+        
+        if pending:
+            runner = BatchAPIRunner(
+                self.model.client, self.model_name, poll_interval, on_progress, self.output_mode
+            )
+            fresh = await runner.arun([requests[i] for i in pending])
+            for i, output in zip(pending, fresh):
+                outputs[i] = output
+                cache_key = lookups[i][0]
+                if cache_key is not None:
+                    self.cache.set(cache_key, output.model_dump_json())
+        
+        return [
+            item
+            for output, size in zip(outputs, chunk_sizes)
+            for item in output.items[:size]
+        ]
+    
+    async def _agenerate_batch(
         self, 
-        agent: Agent, 
+        system_prompt: str, 
         model: Type[BaseModel], 
         prompt: str, 
-        count: int
+        count: int,
+        use_cache: bool = False
     ) -> List[BaseModel]:
-        """Optimized batch generation using a single LLM call."""
+        """Batch generation split into concurrent LLM calls of at most batch_size items."""
         
-        # Create a dynamic batch model
-        batch_model_name = f"Batch{model.__name__}"
+        # Let every chunk settle before failing so no calls are left running unobserved
+        chunks = await asyncio.gather(*self._batch_chunks(
+            system_prompt, model, prompt, count, use_cache
+        ), return_exceptions=True)
         
-        # Create batch model with items field
-        BatchModel = pydantic_create_model(
-            batch_model_name,
-            items=(List[model], ...)
-        )
+        for chunk in chunks:
+            if isinstance(chunk, BaseException):
+                raise chunk
+        
+        return [item for chunk in chunks for item in chunk]
+    
+    async def _aiter_generate(
+        self,
+        system_prompt: str,
+        model: Type[BaseModel],
+        prompt: str,
+        count: int,
+        use_cache: bool = False
+    ) -> AsyncIterator[BaseModel]:
+        """
+        Yield generated instances as soon as the LLM finishes writing each one.
+        
+        Every chunk is streamed, so the first instance arrives after roughly
+        one instance's worth of tokens instead of after the whole chunk.
+        """
+        
+        if count == 1:
+            yield await self._arun_agent(system_prompt, prompt, model, use_cache)
+            return
+        
+        # Chunk streams push instances, errors and an end marker onto one queue
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def drain(stream: AsyncIterator[BaseModel]) -> None:
+            try:
+                async for item in stream:
+                    queue.put_nowait(item)
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                queue.put_nowait(_CHUNK_DONE)
+        
+        tasks = [
+            asyncio.ensure_future(drain(stream))
+            for stream in self._batch_chunks(system_prompt, model, prompt, count, use_cache, stream=True)
+        ]
+        try:
+            pending = len(tasks)
+            while pending:
+                item = await queue.get()
+                if item is _CHUNK_DONE:
+                    pending -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Stop outstanding calls if the consumer stops iterating early
+            for task in tasks:
+                task.cancel()
+    
+    def _batch_chunks(
+        self,
+        system_prompt: str,
+        model: Type[BaseModel],
+        prompt: str,
+        count: int,
+        use_cache: bool = False,
+        stream: bool = False
+    ) -> List[Union[Coroutine[Any, Any, List[BaseModel]], AsyncIterator[BaseModel]]]:
+        """Create one chunk coroutine (or async iterator if stream) per batch_size slice of a batch."""
+        
+        # Counts up to batch_size are requested as a single JSON array
+        BatchModel = _batch_model(model)
+        
+        generate_chunk = self._astream_chunk if stream else self._agenerate_chunk
+        offsets = range(0, count, self.batch_size)
+        return [
+            generate_chunk(
+                system_prompt, model, BatchModel, prompt,
+                min(self.batch_size, count - offset),
+                offset if len(offsets) > 1 else None,
+                use_cache
+            )
+            for offset in offsets
+        ]
+    
+    async def _agenerate_chunk(
+        self,
+        system_prompt: str,
+        model: Type[BaseModel],
+        batch_model: Type[BaseModel],
+        prompt: str,
+        count: int,
+        offset: Optional[int] = None,
+        use_cache: bool = False
+    ) -> List[BaseModel]:
+        """Generate a single chunk of a batch using one LLM call."""
+        
+        batch_prompt = self._build_chunk_prompt(model, prompt, count, offset)
+        output = await self._arun_agent(system_prompt, batch_prompt, batch_model, use_cache)
+        return output.items[:count]
+    
+    async def _astream_chunk(
+        self,
+        system_prompt: str,
+        model: Type[BaseModel],
+        batch_model: Type[BaseModel],
+        prompt: str,
+        count: int,
+        offset: Optional[int] = None,
+        use_cache: bool = False
+    ) -> AsyncIterator[BaseModel]:
+        """Stream a single chunk of a batch, yielding each instance once it is complete."""
+        
+        batch_prompt = self._build_chunk_prompt(model, prompt, count, offset)
+        cache_key, cached = self._cache_lookup(system_prompt, batch_prompt, batch_model, use_cache)
+        if cached is not None:
+            for item in cached.items[:count]:
+                yield item
+            return
+        
+        agent = self._get_agent(system_prompt, batch_model)
+        prompt_tokens = self._estimate_tokens(system_prompt, batch_prompt)
+        emitted = 0
+        
+        try:
+            async with self._get_semaphore():
+                for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                    await self._acquire_rate_limits(prompt_tokens)
+                    try:
+                        async with asyncio.timeout(self.timeout):
+                            async with agent.run_stream(batch_prompt) as result:
+                                async for partial in result.stream_output(debounce_by=None):
+                                    # The last item of a partial response may still be incomplete
+                                    ready = min(len(partial.items) - 1, count)
+                                    for item in partial.items[emitted:ready]:
+                                        yield item
+                                    emitted = max(emitted, ready)
+                                output = await result.get_output()
+                        break
+                    except Exception as e:
+                        # Only retry while nothing has been handed to the consumer yet
+                        if not self._is_retryable(e) or emitted or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                            raise
+                    
+                    await asyncio.sleep(self._backoff_delay(attempt))
+        except TimeoutError as e:
+            raise WeaverError(f"LLM request timed out after {self.timeout} seconds") from e
+        except WeaverError:
+            raise
+        except Exception as e:
+            raise WeaverError(f"Agent execution failed: {str(e)}") from e
+        
+        for item in output.items[emitted:count]:
+            yield item
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, output.model_dump_json())
+    
+    @staticmethod
+    def _build_chunk_prompt(
+        model: Type[BaseModel],
+        prompt: str,
+        count: int,
+        offset: Optional[int] = None
+    ) -> str:
+        """Build the user prompt asking for one chunk of a batch as an 'items' array."""
         
         batch_prompt = f"""Generate exactly {count} different, varied instances of {model.__name__}.
         
@@ -140,58 +772,171 @@ Original prompt: {prompt}
         
 Ensure each instance is unique and realistic. Return all {count} instances in the 'items' array."""
         
-        result = self._run_agent(agent, batch_prompt, BatchModel)
-        return result.output.items[:count]
+        if offset is not None:
+            # Chunks run concurrently, so keep their IDs from colliding
+            batch_prompt += f"\nThis is part of a larger batch: number any IDs starting from {offset + 1}."
+        
+        return batch_prompt
     
-    def _run_agent(self, agent: Agent, prompt: str, output_type: Type[BaseModel]):
-        """Run agent with proper async/sync handling."""
+    async def _arun_agent(
+        self,
+        system_prompt: str,
+        prompt: str,
+        output_type: Type[T],
+        use_cache: bool = False
+    ) -> T:
+        """Run an agent natively inside the current event loop and return its output."""
         
-        import signal
-        import concurrent.futures
+        cache_key, cached = self._cache_lookup(system_prompt, prompt, output_type, use_cache)
+        if cached is not None:
+            return cached
         
-        def timeout_handler(signum, frame):
-            raise TimeoutError("Agent execution timed out")
+        agent = self._get_agent(system_prompt, output_type)
         
         try:
-            # Check if we're in an async context
+            async with self._get_semaphore():
+                result = await self._arun_with_backoff(
+                    agent, prompt, self._estimate_tokens(system_prompt, prompt)
+                )
+        except WeaverError:
+            raise
+        except Exception as e:
+            raise WeaverError(f"Agent execution failed: {str(e)}") from e
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, result.output.model_dump_json())
+        
+        return result.output
+    
+    def _cache_lookup(
+        self,
+        system_prompt: str,
+        prompt: str,
+        output_type: Type[T],
+        use_cache: bool = False
+    ) -> Tuple[Optional[str], Optional[T]]:
+        """Return (cache key, cached output) for a request; both are None when caching is off."""
+        
+        if not use_cache:
+            return None, None
+        
+        if self.cache is None:
+            self.cache = FileCache()
+        
+        cache_key = make_cache_key(
+            provider=self.provider_name,
+            model=self.model_name,
+            settings=getattr(self.model, "settings", None),
+            system_prompt=system_prompt,
+            prompt=prompt,
+            schema=SchemaConverter.schema_fingerprint(output_type),
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
             try:
-                loop = asyncio.get_running_loop()
-                
-                # Always use thread approach in Jupyter to avoid nest_asyncio issues
-                def run_in_thread():
-                    try:
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        
-                        result = new_loop.run_until_complete(
-                            agent.run(prompt, output_type=output_type)
-                        )
-                        return result
-                    finally:
-                        new_loop.close()
-                
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_in_thread)
-                    try:
-                        result = future.result(timeout=60)  # 60 second timeout
-                        return result
-                    except concurrent.futures.TimeoutError:
-                        future.cancel()
-                        raise WeaverError("LLM request timed out after 60 seconds")
-                    
-            except RuntimeError:
-                # No event loop running, safe to use run_sync
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(60)  # 60 second timeout
-                
-                try:
-                    result = agent.run_sync(prompt, output_type=output_type)
-                    return result
-                finally:
-                    signal.alarm(0)  # Clear timeout
-                
+                # Revalidate so entries that no longer fit the model are regenerated
+                return cache_key, output_type.model_validate_json(cached)
+            except PydanticValidationError:
+                self.cache.delete(cache_key)
+        
+        return cache_key, None
+    
+    def _get_agent(self, system_prompt: str, output_type: Type[BaseModel]) -> Agent:
+        """Return the agent for a system prompt and output type, creating it on first use."""
+        
+        key = (system_prompt, output_type)
+        with self._agents_lock:
+            agent = self._agents.get(key)
+            if agent is None:
+                agent = self._agents[key] = Agent(
+                    model=self.model,
+                    system_prompt=system_prompt,
+                    output_type=self._run_output_type(output_type),
+                    retries=3,
+                )
+                if len(self._agents) > self.MAX_CACHED_AGENTS:
+                    self._agents.popitem(last=False)
+            else:
+                self._agents.move_to_end(key)
+            return agent
+    
+    def _run_output_type(self, output_type: Type[BaseModel]) -> Any:
+        """Wrap output_type for the configured output mode."""
+        
+        # Schema-constrained decoding avoids validation retries
+        return NativeOutput(output_type) if self.output_mode == "native" else output_type
+    
+    async def _arun_with_backoff(self, agent: Agent, prompt: str, prompt_tokens: int) -> Any:
+        """Run the agent, retrying with exponential backoff on rate limits, transient server errors and dropped connections."""
+        
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            await self._acquire_rate_limits(prompt_tokens)
+            
+            try:
+                return await asyncio.wait_for(
+                    agent.run(prompt), self.timeout
+                )
+            except TimeoutError as e:
+                # Raised as-is by _arun_agent, so callers see this message unwrapped
+                raise WeaverError(f"LLM request timed out after {self.timeout} seconds") from e
+            except Exception as e:
+                if not self._is_retryable(e) or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    raise
+            
+            await asyncio.sleep(self._backoff_delay(attempt))
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Check whether a failed LLM call is worth retrying after a backoff."""
+        
+        if isinstance(error, ModelHTTPError):
+            return error.status_code in self.RETRYABLE_STATUS_CODES
+        return isinstance(error, _transport_errors())
+    
+    async def _acquire_rate_limits(self, prompt_tokens: int) -> None:
+        """Wait for the request and token budgets before starting an LLM call."""
+        
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        if self.token_limiter is not None:
+            await self.token_limiter.acquire(prompt_tokens)
+    
+    def _estimate_tokens(self, *texts: str) -> int:
+        """Estimate the prompt tokens of an LLM call from its text length."""
+        
+        return sum(map(len, texts)) // self.CHARS_PER_TOKEN
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter delay in seconds before retrying a rejected request."""
+        
+        return random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt))
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the concurrency semaphore for the running event loop."""
+        
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    def run_sync(
+        self,
+        coro: Coroutine[Any, Any, T],
+        timeout: Optional[float] = None
+    ) -> T:
+        """
+        Run a coroutine to completion on Weaver's background event loop.
+        
+        Individual LLM calls are already bounded by self.timeout, so by default
+        the overall call waits for however many calls the batch needs.
+        """
+        
+        try:
+            return _loop.run_sync(coro, timeout)
         except TimeoutError:
-            raise WeaverError("LLM request timed out")
+            raise WeaverError(f"Generation timed out after {timeout} seconds")
+        except WeaverError:
+            raise
         except Exception as e:
             raise WeaverError(f"Agent execution failed: {str(e)}") from e
 
@@ -220,14 +965,9 @@ class BatchProcessor:
         
         for name, model_class in models.items():
             # Basic cost estimation based on field count and complexity
-            field_count = len(model_class.model_fields)
-            dependencies = DependencyResolver.extract_dependency_names(model_class)
+            dependency_count, field_count = _cost_factors(model_class)
             
             # Base cost + dependency cost + field complexity cost
-            base_cost = count
-            dependency_cost = len(dependencies) * count * 0.5
-            field_cost = field_count * count * 0.1
-            
-            costs[name] = int(base_cost + dependency_cost + field_cost)
+            costs[name] = int(count + dependency_count * count * 0.5 + field_count * count * 0.1)
         
         return costs
\ No newline at end of file
@@ -1,99 +1,158 @@
 """Dependency resolution module for automatic model relationship detection."""
 
-from typing import Type, List, Dict, Union
+import sys
+import types
+from collections import deque
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from itertools import islice
+from typing import Type, List, Dict, Union, Iterator, Tuple, Any, Optional, get_args, get_origin
+from uuid import UUID
 from pydantic import BaseModel
 
+# One dependency's section of a correlation context
+_CONTEXT_SECTION = """
+Available {dep_name} instances to reference:
+{lines}
+"""
+
+
+def _iter_model_field_types(model_class: Type[BaseModel]) -> Iterator[Type[BaseModel]]:
+    """Yield the model classes referenced by a model's fields, in field order."""
+    
+    for field_info in model_class.model_fields.values():
+        yield from _iter_annotation_models(field_info.annotation)
+
+
+def _iter_annotation_models(field_type: Any) -> Iterator[Type[BaseModel]]:
+    """Yield the model classes referenced by a single field annotation."""
+    
+    # Handle List[Model] types
+    if hasattr(field_type, '__origin__') and field_type.__origin__ is list:
+        inner_type = field_type.__args__[0]
+        if isinstance(inner_type, type) and issubclass(inner_type, BaseModel):
+            yield inner_type
+    
+    # Handle direct Model types
+    elif isinstance(field_type, type) and issubclass(field_type, BaseModel):
+        yield field_type
+    
+    # Handle Optional[Model] types (Union with None)
+    elif hasattr(field_type, '__origin__') and field_type.__origin__ is Union:
+        for union_type in field_type.__args__:
+            if (isinstance(union_type, type) and 
+                issubclass(union_type, BaseModel) and 
+                union_type != type(None)):
+                yield union_type
+
+
+# Model classes don't change after definition, so their dependencies are
+# resolved once per class. Results are tuples so cached values can't be mutated,
+# deduplicated in field order so prompts (and cache keys) are stable across runs.
+@lru_cache(maxsize=256)
+def _dependency_models(model_class: Type[BaseModel]) -> Tuple[Type[BaseModel], ...]:
+    return tuple(dict.fromkeys(_iter_model_field_types(model_class)))
+
+
+# Annotations whose attribute value is exactly what model_dump() would give
+_SCALAR_TYPES = (bool, int, float, str, Decimal, UUID, Enum, datetime, date, time, timedelta)
+
+
+def _is_scalar_annotation(annotation: Any) -> bool:
+    if get_origin(annotation) in (Union, types.UnionType):
+        return all(arg is type(None) or _is_scalar_annotation(arg) for arg in get_args(annotation))
+    return isinstance(annotation, type) and issubclass(annotation, _SCALAR_TYPES)
+
+
+@lru_cache(maxsize=256)
+def _context_fields(model_class: Type[BaseModel]) -> Tuple[Tuple[str, bool], ...]:
+    # (field name, is scalar) pairs; scalars are read directly, anything else
+    # is dumped to match the form model_dump() gives it in the correlation context
+    return tuple(
+        (name, _is_scalar_annotation(field_info.annotation))
+        for name, field_info in model_class.model_fields.items()
+    )
+
+
+@lru_cache(maxsize=1024)
+def _model_key(model_class: Type[BaseModel]) -> str:
+    # Interned so dict lookups on these keys can short-circuit on identity
+    return sys.intern(model_class.__name__.lower())
+
+
+@lru_cache(maxsize=256)
+def _dependency_names(model_class: Type[BaseModel]) -> Tuple[str, ...]:
+    # Remove duplicates
+    return tuple(dict.fromkeys(_model_key(dep) for dep in _dependency_models(model_class)))
+
 
 class DependencyResolver:
     """Handles automatic detection and resolution of model dependencies."""
     
+    # Most instances of each dependency listed in a correlation context
+    MAX_CONTEXT_INSTANCES = 10
+    
     @staticmethod
-    def auto_detect_dependencies(model_class: Type[BaseModel]) -> List[Type[BaseModel]]:
-        """Automatically detect dependency models from field types."""
+    def model_key(model_class: Type[BaseModel]) -> str:
+        """Return the name a model is keyed by in generated pools and prompts (lowercased class name, memoized)."""
         
-        dependencies = []
+        return _model_key(model_class)
+    
+    @staticmethod
+    def auto_detect_dependencies(model_class: Type[BaseModel]) -> List[Type[BaseModel]]:
+        """Automatically detect dependency models from field types (memoized per class)."""
         
-        for field_name, field_info in model_class.model_fields.items():
-            field_type = field_info.annotation
-            
-            # Handle List[Model] types
-            if hasattr(field_type, '__origin__') and field_type.__origin__ is list:
-                inner_type = field_type.__args__[0]
-                if isinstance(inner_type, type) and issubclass(inner_type, BaseModel):
-                    dependencies.append(inner_type)
-            
-            # Handle direct Model types
-            elif isinstance(field_type, type) and issubclass(field_type, BaseModel):
-                dependencies.append(field_type)
-            
-            # Handle Optional[Model] types (Union with None)
-            elif hasattr(field_type, '__origin__') and field_type.__origin__ is Union:
-                for union_type in field_type.__args__:
-                    if (isinstance(union_type, type) and 
-                        issubclass(union_type, BaseModel) and 
-                        union_type != type(None)):
-                        dependencies.append(union_type)
-        
-        return dependencies
+        return list(_dependency_models(model_class))
     
     @staticmethod
     def extract_dependency_names(model_class: Type[BaseModel]) -> List[str]:
-        """Extract dependency names from a model class using pure auto-detection."""
+        """Extract dependency names from a model class using pure auto-detection (memoized per class)."""
         
-        dependencies = []
+        return list(_dependency_names(model_class))
+    
+    @staticmethod
+    def build_dependency_graph(models: Dict[str, Type[BaseModel]]) -> Dict[str, List[str]]:
+        """
+        Map each model name to the names of the other given models it depends on.
         
-        # Auto-detect from field types only (no decorators needed)
-        for field_name, field_info in model_class.model_fields.items():
-            field_type = field_info.annotation
-            
-            # Handle List[Model] types
-            if hasattr(field_type, '__origin__') and field_type.__origin__ is list:
-                inner_type = field_type.__args__[0]
-                if isinstance(inner_type, type) and issubclass(inner_type, BaseModel):
-                    dependencies.append(inner_type.__name__.lower())
-            
-            # Handle direct Model types
-            elif isinstance(field_type, type) and issubclass(field_type, BaseModel):
-                dependencies.append(field_type.__name__.lower())
-            
-            # Handle Optional[Model] types
-            elif hasattr(field_type, '__origin__') and field_type.__origin__ is Union:
-                for union_type in field_type.__args__:
-                    if (isinstance(union_type, type) and 
-                        issubclass(union_type, BaseModel) and 
-                        union_type != type(None)):
-                        dependencies.append(union_type.__name__.lower())
-        
-        return list(set(dependencies))  # Remove duplicates
+        Build it once and pass it to topological_sort / topological_layers (and
+        anything else that needs a model's dependencies) to skip re-resolving them.
+        """
+        
+        return {
+            name: [dep for dep in _dependency_names(model_class) if dep in models]
+            for name, model_class in models.items()
+        }
     
     @staticmethod
-    def topological_sort(models: Dict[str, Type[BaseModel]]) -> List[str]:
+    def topological_sort(
+        models: Dict[str, Type[BaseModel]],
+        *,
+        adjacency: Optional[Dict[str, List[str]]] = None
+    ) -> List[str]:
         """Sort models by dependency order using topological sort (Kahn's algorithm)."""
         
-        # Build dependency graph
-        graph = {}
-        in_degree = {}
+        if adjacency is None:
+            adjacency = DependencyResolver.build_dependency_graph(models)
         
-        # Initialize graph and in-degree count
-        for name in models.keys():
-            graph[name] = []
-            in_degree[name] = 0
+        # Build dependency graph
+        graph = {name: [] for name in models}
+        in_degree = {name: 0 for name in models}
         
         # Build edges based on dependencies
-        for name, model_class in models.items():
-            dependencies = DependencyResolver.extract_dependency_names(model_class)
-            
+        for name, dependencies in adjacency.items():
             for dep in dependencies:
-                if dep in models:
-                    graph[dep].append(name)  # dep -> name
-                    in_degree[name] += 1
+                graph[dep].append(name)  # dep -> name
+                in_degree[name] += 1
         
-        # Kahn's algorithm for topological sorting
-        queue = [name for name, degree in in_degree.items() if degree == 0]
+        # Kahn's algorithm for topological sorting (deque gives O(1) pops)
+        queue = deque(name for name, degree in in_degree.items() if degree == 0)
         result = []
         
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             result.append(current)
             
             for neighbor in graph[current]:
@@ -108,6 +167,49 @@ class DependencyResolver:
         
         return result
     
+    @staticmethod
+    def topological_layers(
+        models: Dict[str, Type[BaseModel]],
+        *,
+        adjacency: Optional[Dict[str, List[str]]] = None
+    ) -> List[List[str]]:
+        """
+        Group models into dependency layers by repeatedly peeling zero in-degree nodes.
+        
+        Models in the same layer do not depend on each other, so each layer can
+        be generated concurrently once all earlier layers are done.
+        """
+        
+        if adjacency is None:
+            adjacency = DependencyResolver.build_dependency_graph(models)
+        
+        dependents = {name: [] for name in models}
+        in_degree = {name: 0 for name in models}
+        
+        for name, dependencies in adjacency.items():
+            for dep in dependencies:
+                dependents[dep].append(name)  # dep -> name
+                in_degree[name] += 1
+        
+        layers = []
+        layer = [name for name, degree in in_degree.items() if degree == 0]
+        while layer:
+            layers.append(layer)
+            next_layer = []
+            for current in layer:
+                for neighbor in dependents[current]:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        next_layer.append(neighbor)
+            layer = next_layer
+        
+        # Check for cycles
+        if sum(len(layer) for layer in layers) != len(models):
+            # Fallback to original order, one model at a time, as topological_sort does
+            return [[name] for name in models]
+        
+        return layers
+    
     @staticmethod
     def build_correlation_context(
         model_class: Type[BaseModel], 
@@ -116,7 +218,17 @@ class DependencyResolver:
     ) -> str:
         """Build detailed correlation context for dependent models."""
         
-        context_parts = []
+        return "\n".join(DependencyResolver.iter_correlation_context(
+            model_class, generated_pool, dependencies
+        ))
+    
+    @staticmethod
+    def iter_correlation_context(
+        model_class: Type[BaseModel], 
+        generated_pool: Dict[str, any],
+        dependencies: List[str]
+    ) -> Iterator[str]:
+        """Yield the correlation context section of each dependency present in the pool."""
         
         for dep_name in dependencies:
             if dep_name not in generated_pool:
@@ -127,7 +239,7 @@ class DependencyResolver:
             
             # Extract key identifying fields (typically 'id', 'name', etc.)
             id_info = []
-            for instance in dep_instances:
+            for instance in islice(dep_instances, DependencyResolver.MAX_CONTEXT_INSTANCES):
                 instance_info = {}
                 
                 # Try to find ID field first
@@ -137,18 +249,22 @@ class DependencyResolver:
                     instance_info['name'] = instance.name
                 
                 # Include other key fields for context (avoid long strings)
-                for field_name, field_value in instance.model_dump().items():
-                    if field_name not in instance_info and len(str(field_value)) < 50:
+                for field_name, scalar in _context_fields(type(instance)):
+                    if field_name in instance_info:
+                        continue
+                    if scalar:
+                        field_value = getattr(instance, field_name)
+                    else:
+                        field_value = instance.model_dump(include={field_name})[field_name]
+                    if len(str(field_value)) < 50:
                         instance_info[field_name] = field_value
                         
                 id_info.append(instance_info)
             
-            context_parts.append(f"""
-Available {dep_name} instances to reference:
-{chr(10).join([f"  - {info}" for info in id_info[:10]])}  # Show max 10 instances
-""")
-        
-        return "\n".join(context_parts)
+            yield _CONTEXT_SECTION.format(
+                dep_name=dep_name,
+                lines="\n".join(f"  - {info}" for info in id_info)
+            )
     
     @staticmethod
     def normalize_models_input(
@@ -157,7 +273,7 @@ Available {dep_name} instances to reference:
         """Normalize different model input formats to a consistent dict format."""
         
         if isinstance(models, list):
-            return {model.__name__.lower(): model for model in models}
+            return {_model_key(model): model for model in models}
         elif isinstance(models, dict):
             return models
         else:
@@ -1,8 +1,83 @@
 """Intelligent prompt building module for enhanced data generation."""
 
-from typing import Type, Dict, Any, Union
+from functools import lru_cache
+from typing import Type, Dict, Any, List, Union, Callable, Optional, Tuple
 from pydantic import BaseModel
 
+from .dependency_resolver import DependencyResolver
+
+# Inferred base prompts keyed by model-name substring, checked in order
+_NAME_PROMPTS: Dict[str, str] = {
+    'user': "Generate diverse user profiles with realistic personal information",
+    'product': "Generate varied product listings with realistic prices and descriptions",
+    'order': "Generate realistic order data with proper quantities and totals",
+    'company': "Generate realistic company information with proper business details",
+    'address': "Generate realistic address information with proper formatting",
+    'payment': "Generate realistic payment information with valid formats",
+    'customer': "Generate diverse customer profiles with realistic demographics",
+    'employee': "Generate realistic employee information with job details",
+}
+
+# Core quality enhancements, applied unless the option is set to False
+_DEFAULT_ON_ENHANCEMENTS: Dict[str, str] = {
+    'realistic': "Ensure all data is realistic and plausible.",
+    'diverse': "Generate diverse and varied instances.",
+}
+
+# Enhancements formatted from the option's value
+_VALUE_ENHANCEMENTS: Dict[str, Callable[[Any], str]] = {
+    # Geographic and cultural enhancements
+    'region': lambda v: f"Data should be appropriate for {v} region.",
+    'country': lambda v: f"Use {v} country-specific conventions.",
+    'language': lambda v: f"Use {v} language and cultural context.",
+    # Demographic enhancements
+    'age_range': lambda v: f"Ages should be between {v[0]} and {v[1]}.",
+    'gender': lambda v: f"Focus on {v} demographics.",
+    # Business and industry enhancements
+    'industry': lambda v: f"Context should be relevant to {v} industry.",
+    'business_size': lambda v: f"Target {v} business context.",
+    # Temporal enhancements
+    'time_period': lambda v: f"Data should reflect {v} time period.",
+    'season': lambda v: f"Consider {v} seasonal context.",
+}
+
+# Quality and style enhancements, applied when the option is truthy
+_FLAG_ENHANCEMENTS: Dict[str, str] = {
+    'premium': "Focus on premium, high-quality options.",
+    'budget': "Focus on budget-friendly, economical options.",
+    'professional': "Use professional, business-appropriate context.",
+}
+
+# Wrapped around the correlation context in dependent models' prompts
+_CORRELATION_HEADER = "\n\nCRITICAL CORRELATION REQUIREMENTS:\n"
+_CORRELATION_FOOTER = (
+    "\n\nThe generated data MUST reference the exact IDs and values provided above. "
+    "Do not create new IDs - only use the ones listed."
+)
+
+
+def _freeze_options(options: Dict[str, Any] = None) -> Optional[Tuple[Tuple[str, Any, Any], ...]]:
+    """Return options as a hashable cache key, or None if a value is unhashable."""
+    
+    # Values are tagged with their type because the cache compares by
+    # equality: 1, 1.0 and True (which format differently) must not share an entry
+    frozen = tuple(
+        (key, _type_signature(value), value) for key, value in sorted(options.items())
+    ) if options else ()
+    try:
+        hash(frozen)
+    except TypeError:
+        return None
+    return frozen
+
+
+def _type_signature(value: Any) -> Any:
+    """Return the type of value, recursing into tuples (e.g. age_range=(18, 65))."""
+    
+    if isinstance(value, tuple):
+        return (type(value), tuple(_type_signature(item) for item in value))
+    return type(value)
+
 
 class PromptBuilder:
     """Handles intelligent prompt construction and enhancement."""
@@ -14,26 +89,13 @@ class PromptBuilder:
         if options is None:
             options = {}
             
-        model_name = model_class.__name__
-        base_prompt = f"Generate realistic {model_name.lower()} data"
-        
-        # Add contextual hints based on model name patterns
-        if 'user' in model_name.lower():
-            base_prompt = "Generate diverse user profiles with realistic personal information"
-        elif 'product' in model_name.lower():
-            base_prompt = "Generate varied product listings with realistic prices and descriptions"
-        elif 'order' in model_name.lower():
-            base_prompt = "Generate realistic order data with proper quantities and totals"
-        elif 'company' in model_name.lower():
-            base_prompt = "Generate realistic company information with proper business details"
-        elif 'address' in model_name.lower():
-            base_prompt = "Generate realistic address information with proper formatting"
-        elif 'payment' in model_name.lower():
-            base_prompt = "Generate realistic payment information with valid formats"
-        elif 'customer' in model_name.lower():
-            base_prompt = "Generate diverse customer profiles with realistic demographics"
-        elif 'employee' in model_name.lower():
-            base_prompt = "Generate realistic employee information with job details"
+        model_name = DependencyResolver.model_key(model_class)
+        
+        # Add contextual hints based on model name patterns (first match wins)
+        base_prompt = next(
+            (prompt for keyword, prompt in _NAME_PROMPTS.items() if keyword in model_name),
+            f"Generate realistic {model_name} data"
+        )
         
         return PromptBuilder.enhance_prompt(base_prompt, model_class, options)
     
@@ -43,64 +105,47 @@ class PromptBuilder:
         model_class: Type[BaseModel], 
         options: Dict[str, Any] = None
     ) -> str:
-        """Enhance a prompt based on options (similar to smart_prompt functionality)."""
+        """
+        Enhance a prompt based on options (similar to smart_prompt functionality).
+        
+        Memoized per (prompt, class, options) when all option values are hashable.
+        """
+        
+        frozen_options = _freeze_options(options)
+        if frozen_options is None:
+            return PromptBuilder._build_enhanced_prompt(base_prompt, model_class, options)
+        return PromptBuilder._cached_enhanced_prompt(base_prompt, model_class, frozen_options)
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _cached_enhanced_prompt(
+        base_prompt: str,
+        model_class: Type[BaseModel],
+        frozen_options: Tuple[Tuple[str, Any, Any], ...]
+    ) -> str:
+        options = {key: value for key, _, value in frozen_options}
+        return PromptBuilder._build_enhanced_prompt(base_prompt, model_class, options)
+    
+    @staticmethod
+    def _build_enhanced_prompt(
+        base_prompt: str,
+        model_class: Type[BaseModel],
+        options: Dict[str, Any] = None
+    ) -> str:
+        """Build the enhanced prompt without caching."""
         
         if options is None:
             options = {}
         
         if not base_prompt:
-            base_prompt = f"Generate realistic {model_class.__name__.lower()} data"
-        
-        enhancements = []
+            base_prompt = f"Generate realistic {DependencyResolver.model_key(model_class)} data"
         
-        # Core quality enhancements
-        if options.get('realistic', True):
-            enhancements.append("Ensure all data is realistic and plausible.")
-        
-        if options.get('diverse', True):
-            enhancements.append("Generate diverse and varied instances.")
-        
-        # Geographic and cultural enhancements
-        if 'region' in options:
-            enhancements.append(f"Data should be appropriate for {options['region']} region.")
-        
-        if 'country' in options:
-            enhancements.append(f"Use {options['country']} country-specific conventions.")
-        
-        if 'language' in options:
-            enhancements.append(f"Use {options['language']} language and cultural context.")
-        
-        # Demographic enhancements
-        if 'age_range' in options:
-            age_min, age_max = options['age_range']
-            enhancements.append(f"Ages should be between {age_min} and {age_max}.")
-        
-        if 'gender' in options:
-            enhancements.append(f"Focus on {options['gender']} demographics.")
-        
-        # Business and industry enhancements
-        if 'industry' in options:
-            enhancements.append(f"Context should be relevant to {options['industry']} industry.")
-        
-        if 'business_size' in options:
-            enhancements.append(f"Target {options['business_size']} business context.")
-        
-        # Temporal enhancements
-        if 'time_period' in options:
-            enhancements.append(f"Data should reflect {options['time_period']} time period.")
-        
-        if 'season' in options:
-            enhancements.append(f"Consider {options['season']} seasonal context.")
-        
-        # Quality and style enhancements
-        if 'premium' in options and options['premium']:
-            enhancements.append("Focus on premium, high-quality options.")
-        
-        if 'budget' in options and options['budget']:
-            enhancements.append("Focus on budget-friendly, economical options.")
-        
-        if 'professional' in options and options['professional']:
-            enhancements.append("Use professional, business-appropriate context.")
+        # Tables are walked in declaration order so prompts (and cache keys) are stable
+        enhancements = [text for key, text in _DEFAULT_ON_ENHANCEMENTS.items() if options.get(key, True)]
+        enhancements.extend(
+            format_value(options[key]) for key, format_value in _VALUE_ENHANCEMENTS.items() if key in options
+        )
+        enhancements.extend(text for key, text in _FLAG_ENHANCEMENTS.items() if options.get(key))
         
         # Combine base prompt with enhancements
         if enhancements:
@@ -119,21 +164,54 @@ class PromptBuilder:
         if not correlation_context:
             return base_prompt
         
-        enhanced_prompt = f"""{base_prompt}
-
-CRITICAL CORRELATION REQUIREMENTS:
-{correlation_context}
-
-The generated data MUST reference the exact IDs and values provided above. Do not create new IDs - only use the ones listed."""
+        return "".join((base_prompt, _CORRELATION_HEADER, correlation_context, _CORRELATION_FOOTER))
+    
+    @staticmethod
+    def build_correlation_request(
+        model_class: Type[BaseModel],
+        base_prompt: str,
+        generated_pool: Dict[str, Any],
+        dependencies: List[str]
+    ) -> Tuple[str, str]:
+        """
+        Build the (system prompt, user prompt) pair for a model correlated with generated data.
+        
+        Equivalent to build_correlation_context + build_correlation_prompt +
+        build_system_prompt, but joins the user prompt in a single pass.
         
-        return enhanced_prompt
+        Args:
+            model_class: Model being generated
+            base_prompt: User prompt for the model
+            generated_pool: Already generated data keyed by dependency name
+            dependencies: Dependency names to reference
+            
+        Returns:
+            Tuple of (system prompt, user prompt)
+        """
+        
+        system_prompt = PromptBuilder.build_system_prompt(model_class, has_correlations=True)
+        
+        sections = list(DependencyResolver.iter_correlation_context(
+            model_class, generated_pool, dependencies
+        ))
+        if not sections:
+            return system_prompt, base_prompt
+        
+        parts = [base_prompt, _CORRELATION_HEADER, sections[0]]
+        for section in sections[1:]:
+            parts.append("\n")
+            parts.append(section)
+        parts.append(_CORRELATION_FOOTER)
+        
+        return system_prompt, "".join(parts)
     
     @staticmethod
+    @lru_cache(maxsize=512)
     def build_system_prompt(
         model_class: Type[BaseModel],
         has_correlations: bool = False
     ) -> str:
-        """Build system prompt based on model and correlation requirements."""
+        """Build system prompt based on model and correlation requirements (memoized per class)."""
         
         base_system = f"""Generate realistic, varied {model_class.__name__} data.
 
@@ -158,8 +236,9 @@ CORRELATION RULES:
         return base_system
     
     @staticmethod
+    @lru_cache(maxsize=512)
     def build_independent_system_prompt(model_class: Type[BaseModel]) -> str:
-        """Build system prompt for independent models without dependencies."""
+        """Build system prompt for independent models without dependencies (memoized per class)."""
         
         return f"""Generate realistic, varied {model_class.__name__} data.
         
@@ -176,24 +255,27 @@ RULES:
         model_names: list,
         options: Dict[str, Any] = None
     ) -> Dict[str, str]:
-        """Normalize different prompt input formats to a consistent dict format."""
+        """
+        Normalize different prompt input formats to a consistent dict format.
+        
+        A dict that already has a prompt for every model is returned as is
+        (not copied), so callers must not mutate the result.
+        """
         
         if options is None:
             options = {}
         
         if isinstance(prompts, str):
             # Single prompt for all models
-            return {name: prompts for name in model_names}
+            return dict.fromkeys(model_names, prompts)
         elif isinstance(prompts, dict):
-            # Dict of prompts - fill missing ones
-            result = {}
-            for name in model_names:
-                if name in prompts:
-                    result[name] = prompts[name]
-                else:
-                    # Generate default prompt for missing models
-                    result[name] = f"Generate realistic {name} data"
-            return result
+            if all(name in prompts for name in model_names):
+                return prompts
+            # Dict of prompts - fill missing ones with a default prompt
+            return {
+                name: prompts[name] if name in prompts else f"Generate realistic {name} data"
+                for name in model_names
+            }
         elif prompts is None or prompts == "":
             # No prompts provided - generate defaults
             return {name: f"Generate realistic {name} data" for name in model_names}
@@ -0,0 +1,62 @@
+"""Request rate limiting for LLM calls."""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Token-bucket limiter allowing max_rate acquisitions per time_period.
+
+    Up to max_rate calls may burst immediately; after that, callers wait for
+    tokens to refill at a steady rate. Acquisitions may weigh more than one
+    token (e.g. an LLM call's estimated prompt tokens). Safe to share between
+    event loops running in different threads.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_rate: Number of acquisitions allowed per time_period
+            time_period: Window length in seconds (default: one minute)
+        """
+        if max_rate <= 0 or time_period <= 0:
+            raise ValueError("max_rate and time_period must be positive")
+
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._rate = max_rate / time_period  # tokens per second
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """
+        Wait until amount tokens are available and consume them.
+
+        Args:
+            amount: Tokens to consume (capped at max_rate so a single call can always proceed)
+        """
+        amount = min(amount, self.max_rate)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.max_rate, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+
+                wait = (amount - self._tokens) / self._rate
+
+            await asyncio.sleep(wait)
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
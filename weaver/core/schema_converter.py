@@ -0,0 +1,63 @@
+"""Pydantic to JSON Schema conversion."""
+
+import hashlib
+import json
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Type, Mapping, Any
+from pydantic import BaseModel
+
+from ..exceptions import SchemaConversionError
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class SchemaConverter:
+    """Converts Pydantic models to JSON Schema for LLM consumption."""
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def convert_to_json_schema(model: Type[BaseModel]) -> Mapping[str, Any]:
+        """
+        Convert a Pydantic model class to JSON Schema, memoized per class.
+
+        The result is shared between callers, so it is returned as a read-only
+        mapping to keep downstream code from mutating the cached schema.
+        """
+
+        try:
+            return MappingProxyType(model.model_json_schema())
+        except Exception as e:
+            raise SchemaConversionError(
+                f"Failed to convert {model.__name__} to JSON Schema: {str(e)}"
+            ) from e
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def convert_to_json_schema_bytes(model: Type[BaseModel]) -> bytes:
+        """
+        Serialize a model's JSON Schema once per class.
+        
+        Keys are sorted and separators compact, so the bytes are stable and
+        can be embedded verbatim in request bodies or hashed into cache keys.
+        """
+        
+        # The cached schema is a read-only mapping proxy, which serializers reject
+        schema = dict(SchemaConverter.convert_to_json_schema(model))
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(schema, option=orjson.OPT_SORT_KEYS)
+        return json.dumps(
+            schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def schema_fingerprint(model: Type[BaseModel]) -> str:
+        """Return a SHA-256 hex digest of the model's serialized JSON Schema."""
+        
+        return hashlib.sha256(SchemaConverter.convert_to_json_schema_bytes(model)).hexdigest()
+
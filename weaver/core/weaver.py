@@ -1,15 +1,61 @@
 """Core Weaver class for generating test data."""
 
-from typing import Type, Union, List, Optional, Dict, Any
-from pydantic import BaseModel
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Type, Union, List, Optional, Dict, Any, AsyncIterator, Callable, Tuple
+
+from pydantic import BaseModel, TypeAdapter
 
 from .dependency_resolver import DependencyResolver
 from .prompt_builder import PromptBuilder
 from .data_generator import DataGenerator
-from ..models import create_model, get_default_model
+from ..cache import CacheInterface, SemanticCache, StructuralCache
+from ..models import create_model, get_default_model, resolve_api_key
+from .. import _loop
 from ..exceptions import WeaverError
 
 
+# Instances returned by Weaver.from_config, keyed by (provider, model, API key
+# hash, sorted settings); least recently used evicted beyond _MAX_SHARED_WEAVERS
+_MAX_SHARED_WEAVERS = 16
+_SHARED_WEAVERS: "OrderedDict[Tuple[Any, ...], Weaver]" = OrderedDict()
+_SHARED_WEAVERS_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Build the adapter serializing a list of one model class."""
+    return TypeAdapter(List[model])
+
+
+def _is_model_class(model: Any) -> bool:
+    """Check whether model is a Pydantic model class."""
+    return isinstance(model, type) and _is_model_subclass(model)
+
+
+@lru_cache(maxsize=1024)
+def _is_model_subclass(cls: type) -> bool:
+    # Pydantic's metaclass derives from ABCMeta, whose issubclass hook is ~4x slower than a cache hit
+    return issubclass(cls, BaseModel)
+
+
+def _dump_list_json(items: List[BaseModel]) -> str:
+    """Serialize a list of instances as indented JSON in a single pass.
+    
+    The layout matches joining each item's model_dump_json(indent=2): items
+    start at column 0 inside the brackets.
+    """
+    
+    model = type(items[0]) if items else BaseModel
+    if not items or any(type(item) is not model for item in items):
+        # Mixed classes would be serialized as the first one's fields
+        return "[\n" + ",\n".join(item.model_dump_json(indent=2) for item in items) + "\n]"
+    # JSON escapes newlines inside strings, so every line break is layout
+    return _list_adapter(model).dump_json(items, indent=2).decode().replace("\n  ", "\n")
+
+
 class Weaver:
     """Main class for generating realistic test data using LLMs.
     
@@ -22,6 +68,17 @@ class Weaver:
         provider: Union[str, object] = "openai",
         api_key: Optional[str] = None,
         model: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        http_client: Optional[Any] = None,
+        cache: Optional[CacheInterface] = None,
+        batch_size: int = DataGenerator.DEFAULT_BATCH_SIZE,
+        output_mode: str = "tool",
+        max_concurrency: int = DataGenerator.DEFAULT_MAX_CONCURRENCY,
+        rate_limit_rpm: Optional[float] = None,
+        timeout: Optional[float] = DataGenerator.DEFAULT_TIMEOUT,
+        structural_cache: Optional[StructuralCache] = None,
+        rate_limit_tpm: Optional[float] = None,
+        semantic_cache: Optional[SemanticCache] = None,
         **config
     ):
         """
@@ -31,6 +88,17 @@ class Weaver:
             provider: Provider name or Pydantic AI provider instance
             api_key: API key for the provider (ignored if provider is instance)
             model: Model name to use
+            max_connections: HTTP connection-pool size (ignored if provider is instance)
+            http_client: Custom httpx/httpx2 AsyncClient for provider requests, of the type the provider SDK expects (ignored if provider is instance)
+            cache: Cache backend used when generating with use_cache=True (defaults to FileCache)
+            batch_size: Most instances requested per LLM call; larger counts are split into concurrent calls
+            output_mode: "tool" (tool call), or "native" (JSON schema response format) for models known to support it
+            max_concurrency: Most LLM calls in flight at once
+            rate_limit_rpm: Most LLM calls started per minute (unlimited if not specified)
+            timeout: Seconds each LLM call may take before it is cancelled (None disables)
+            structural_cache: Cache reusing correlated generations whose dependencies only differ in their values (with use_cache=True)
+            rate_limit_tpm: Most estimated prompt tokens sent per minute (unlimited if not specified)
+            semantic_cache: Cache reusing independent generations for similarly worded prompts (with use_cache=True)
             **config: Additional provider configuration
         """
         self.config = config
@@ -43,6 +111,8 @@ class Weaver:
                 provider_name=provider,
                 model_name=self.model_name,
                 api_key=api_key,
+                max_connections=max_connections,
+                http_client=http_client,
                 **config
             )
             self.provider_name = provider
@@ -53,13 +123,70 @@ class Weaver:
             self.provider_name = getattr(provider, '__class__', type(provider)).__name__.lower().replace('model', '')
         
         # Initialize specialized modules
-        self._data_generator = DataGenerator(self.model, self.model_name, self.provider_name)
+        self._data_generator = DataGenerator(
+            self.model, self.model_name, self.provider_name,
+            cache=cache, batch_size=batch_size, output_mode=output_mode,
+            max_concurrency=max_concurrency, rate_limit_rpm=rate_limit_rpm,
+            timeout=timeout, structural_cache=structural_cache,
+            rate_limit_tpm=rate_limit_tpm, semantic_cache=semantic_cache
+        )
+    
+    @classmethod
+    def from_config(
+        cls,
+        provider: str = "openai",
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        **settings
+    ) -> "Weaver":
+        """
+        Return a shared Weaver for a configuration, creating it on first use.
+        
+        Repeated calls with the same provider, model, API key and settings
+        (e.g. across tests or scripts) reuse one instance instead of creating
+        a new model and generator each time. Shared instances share their
+        agents and caches; call Weaver(...) directly for an independent one.
+        Configurations with unhashable settings are never shared.
+        
+        Args:
+            provider: Provider name
+            model: Model name to use
+            api_key: API key for the provider, or its environment variable if not specified (only its hash is kept as the cache key)
+            **settings: Any other Weaver(...) keyword arguments
+            
+        Returns:
+            Weaver instance for the configuration
+        """
+        # Hash the key actually used, so rotating an environment variable key
+        # gets a new instance instead of the one holding the old key
+        if isinstance(provider, str):
+            resolved_key = resolve_api_key(provider, api_key)
+        else:
+            resolved_key = api_key
+        key_hash = hashlib.sha256(resolved_key.encode("utf-8")).hexdigest() if resolved_key else None
+        key = (cls, provider, model, key_hash, tuple(sorted(settings.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return cls(provider=provider, api_key=api_key, model=model, **settings)
+        
+        with _SHARED_WEAVERS_LOCK:
+            weaver = _SHARED_WEAVERS.get(key)
+            if weaver is None:
+                weaver = _SHARED_WEAVERS[key] = cls(provider=provider, api_key=api_key, model=model, **settings)
+                if len(_SHARED_WEAVERS) > _MAX_SHARED_WEAVERS:
+                    _SHARED_WEAVERS.popitem(last=False)
+            else:
+                _SHARED_WEAVERS.move_to_end(key)
+            return weaver
     
     def generate(
         self,
         model: Union[Type[BaseModel], Dict[str, Type[BaseModel]], List[Type[BaseModel]]],
         prompt: Union[str, Dict[str, str]] = "",
         count: int = 1,
+        use_cache: bool = False,
+        mode: str = "realtime",
         **options
     ) -> Union[BaseModel, List[BaseModel], Dict[str, Union[BaseModel, List[BaseModel]]]]:
         """
@@ -69,32 +196,235 @@ class Weaver:
             model: Single model, dict of models, or list of models
             prompt: Single prompt, dict of prompts, or default prompt
             count: Number of instances to generate
+            use_cache: Reuse responses stored for identical requests instead of calling the LLM
+            mode: "realtime", or "batch" to use the OpenAI Batch API (see generate_batch_api)
             **options: Additional options (realistic=True, diverse=True, etc.)
 
         Returns:
             Generated data matching input structure
         """
+        if mode == "batch":
+            return self.generate_batch_api(model, prompt, count, use_cache=use_cache, **options)
+        elif mode != "realtime":
+            raise WeaverError(f"Invalid mode: {mode!r} (expected 'realtime' or 'batch')")
+        
+        return self._data_generator.run_sync(
+            self._agenerate(model, prompt, count, use_cache, **options)
+        )
+    
+    def generate_batch_api(
+        self,
+        model: Type[BaseModel],
+        prompt: str = "",
+        count: int = 1,
+        poll_interval: float = 30.0,
+        on_progress: Optional[Callable[[Any], None]] = None,
+        use_cache: bool = False,
+        **options
+    ) -> List[BaseModel]:
+        """
+        Generate instances through the OpenAI Batch API.
+        
+        Requests are uploaded as one JSONL batch and processed by OpenAI
+        within 24 hours at half the regular cost, which suits seeding test
+        databases rather than interactive use. This call blocks until the
+        batch finishes; dependencies of the model are generated normally first.
+        
+        Args:
+            model: Pydantic model class to generate
+            prompt: Generation prompt
+            count: Number of instances to generate
+            poll_interval: Seconds between batch status checks
+            on_progress: Called with the openai Batch object after every status check
+            use_cache: Reuse chunks stored for identical requests and leave them out of the batch
+            **options: Additional options (realistic=True, diverse=True, etc.)
+            
+        Returns:
+            List of generated model instances
+        """
+        return self._data_generator.run_sync(
+            self._agenerate_batch_api(
+                model, prompt, count, poll_interval, on_progress, use_cache, **options
+            )
+        )
+    
+    async def agenerate_batch_api(
+        self,
+        model: Type[BaseModel],
+        prompt: str = "",
+        count: int = 1,
+        poll_interval: float = 30.0,
+        on_progress: Optional[Callable[[Any], None]] = None,
+        use_cache: bool = False,
+        **options
+    ) -> List[BaseModel]:
+        """Async version of `generate_batch_api`."""
+        
+        return await _loop.run_async(
+            self._agenerate_batch_api(
+                model, prompt, count, poll_interval, on_progress, use_cache, **options
+            )
+        )
+    
+    async def _agenerate_batch_api(
+        self,
+        model: Type[BaseModel],
+        prompt: str,
+        count: int,
+        poll_interval: float,
+        on_progress: Optional[Callable[[Any], None]],
+        use_cache: bool,
+        **options
+    ) -> List[BaseModel]:
+        if not _is_model_class(model):
+            raise WeaverError(f"Batch mode supports a single model class, got {type(model)}")
         
+        try:
+            enhanced_prompt = PromptBuilder.enhance_prompt(prompt, model, options)
+            dependencies = DependencyResolver.auto_detect_dependencies(model)
+            
+            generated_pool = None
+            if dependencies:
+                dependency_models = {DependencyResolver.model_key(dep): dep for dep in dependencies}
+                dependency_prompts = {
+                    name: PromptBuilder.infer_prompt(dep, options)
+                    for name, dep in dependency_models.items()
+                }
+                generated_pool = await self._data_generator.agenerate_related_data(
+                    dependency_models, dependency_prompts, count, use_cache
+                )
+            
+            return await self._data_generator.agenerate_batch_api(
+                model, enhanced_prompt, count,
+                generated_pool, list(generated_pool or ()),
+                poll_interval, on_progress, use_cache
+            )
+            
+        except WeaverError:
+            raise
+        except Exception as e:
+            raise WeaverError(f"Batch generation failed: {str(e)}") from e
+    
+    async def agenerate(
+        self,
+        model: Union[Type[BaseModel], Dict[str, Type[BaseModel]], List[Type[BaseModel]]],
+        prompt: Union[str, Dict[str, str]] = "",
+        count: int = 1,
+        use_cache: bool = False,
+        **options
+    ) -> Union[BaseModel, List[BaseModel], Dict[str, Union[BaseModel, List[BaseModel]]]]:
+        """
+        Async version of `generate` for use inside a running event loop.
+        
+        Batches larger than a single LLM call can hold are split into chunks
+        that are requested concurrently, so wall-clock time tracks the slowest
+        chunk instead of the sum of all of them. The calls run on Weaver's
+        background loop, which owns the pooled HTTP connections, whichever
+        loop awaits this.
+        """
+        
+        return await _loop.run_async(self._agenerate(model, prompt, count, use_cache, **options))
+    
+    async def _agenerate(
+        self,
+        model: Union[Type[BaseModel], Dict[str, Type[BaseModel]], List[Type[BaseModel]]],
+        prompt: Union[str, Dict[str, str]],
+        count: int,
+        use_cache: bool,
+        **options
+    ) -> Union[BaseModel, List[BaseModel], Dict[str, Union[BaseModel, List[BaseModel]]]]:
         try:
             # Scenario 1: Single model
-            if isinstance(model, type) and issubclass(model, BaseModel):
-                return self._generate_single(model, prompt, count, **options)
+            if _is_model_class(model):
+                return await self._agenerate_single(model, prompt, count, use_cache, **options)
             
             # Scenario 2: Multiple models (dict or list)
             elif isinstance(model, (dict, list)):
-                return self._generate_multiple(model, prompt, count, **options)
+                return await self._agenerate_multiple(model, prompt, count, use_cache, **options)
             
             else:
                 raise WeaverError(f"Invalid model type: {type(model)}")
                 
+        except WeaverError:
+            raise
         except Exception as e:
             raise WeaverError(f"Generation failed: {str(e)}") from e
     
-    def _generate_single(
+    async def generate_iter(
+        self,
+        model: Type[BaseModel],
+        prompt: str = "",
+        count: int = 1,
+        use_cache: bool = False,
+        **options
+    ) -> AsyncIterator[BaseModel]:
+        """
+        Stream instances of a single model as each LLM call completes.
+        
+        Lets consumers aggregate or persist results while the remaining
+        chunks of a large batch are still being generated.
+        
+        Args:
+            model: Pydantic model class to generate
+            prompt: Generation prompt
+            count: Number of instances to generate
+            use_cache: Reuse responses stored for identical requests instead of calling the LLM
+            **options: Additional options (realistic=True, diverse=True, etc.)
+            
+        Yields:
+            Generated model instances, in completion order
+        """
+        
+        async for item in _loop.iterate(self._generate_iter(model, prompt, count, use_cache, **options)):
+            yield item
+    
+    async def _generate_iter(
+        self,
+        model: Type[BaseModel],
+        prompt: str,
+        count: int,
+        use_cache: bool,
+        **options
+    ) -> AsyncIterator[BaseModel]:
+        if not _is_model_class(model):
+            raise WeaverError(f"generate_iter supports a single model class, got {type(model)}")
+        
+        try:
+            enhanced_prompt = PromptBuilder.enhance_prompt(prompt, model, options)
+            dependencies = DependencyResolver.auto_detect_dependencies(model)
+            
+            if dependencies:
+                # Dependencies are generated up front so the stream can reference them
+                dependency_models = {DependencyResolver.model_key(dep): dep for dep in dependencies}
+                dependency_prompts = {
+                    name: PromptBuilder.infer_prompt(dep, options)
+                    for name, dep in dependency_models.items()
+                }
+                generated_pool = await self._data_generator.agenerate_related_data(
+                    dependency_models, dependency_prompts, count, use_cache
+                )
+                stream = self._data_generator.aiter_with_correlations(
+                    model, enhanced_prompt, count, generated_pool, list(generated_pool), use_cache
+                )
+            else:
+                stream = self._data_generator.aiter_independent(
+                    model, enhanced_prompt, count, use_cache
+                )
+            
+            async for item in stream:
+                yield item
+                
+        except WeaverError:
+            raise
+        except Exception as e:
+            raise WeaverError(f"Generation failed: {str(e)}") from e
+    
+    async def _agenerate_single(
         self, 
         model: Type[BaseModel], 
         prompt: str, 
         count: int, 
+        use_cache: bool = False,
         **options
     ) -> Union[BaseModel, List[BaseModel]]:
         """Generate data for a single model with auto-dependency detection."""
@@ -103,23 +433,19 @@ class Weaver:
         dependencies = DependencyResolver.auto_detect_dependencies(model)
         
         if dependencies:
-            # This model has dependencies - generate them first
-            dependency_models = {}
-            dependency_prompts = {}
-            
-            for dep_model_class in dependencies:
-                dep_name = dep_model_class.__name__.lower()
-                dependency_models[dep_name] = dep_model_class
-                dependency_prompts[dep_name] = PromptBuilder.infer_prompt(dep_model_class, options)
-            
-            # Add the main model
-            main_name = model.__name__.lower()
+            # This model has dependencies - generate them first, then the main model
+            main_name = DependencyResolver.model_key(model)
+            dependency_models = {DependencyResolver.model_key(dep): dep for dep in dependencies}
             dependency_models[main_name] = model
+            dependency_prompts = {
+                name: PromptBuilder.infer_prompt(dep, options)
+                for name, dep in dependency_models.items() if dep is not model
+            }
             dependency_prompts[main_name] = PromptBuilder.enhance_prompt(prompt, model, options)
             
             # Generate all related data
-            results = self._data_generator.generate_related_data(
-                dependency_models, dependency_prompts, count
+            results = await self._data_generator.agenerate_related_data(
+                dependency_models, dependency_prompts, count, use_cache
             )
             
             # Return only the requested model's data
@@ -127,13 +453,16 @@ class Weaver:
         else:
             # No dependencies - generate directly
             enhanced_prompt = PromptBuilder.enhance_prompt(prompt, model, options)
-            return self._data_generator.generate_independent(model, enhanced_prompt, count)
+            return await self._data_generator.agenerate_independent(
+                model, enhanced_prompt, count, use_cache
+            )
     
-    def _generate_multiple(
+    async def _agenerate_multiple(
         self, 
         models: Union[Dict[str, Type[BaseModel]], List[Type[BaseModel]]], 
         prompts: Union[str, Dict[str, str]], 
         count: int, 
+        use_cache: bool = False,
         **options
     ) -> Dict[str, Union[BaseModel, List[BaseModel]]]:
         """Generate data for multiple models with automatic relationship detection."""
@@ -143,14 +472,16 @@ class Weaver:
         model_names = list(models_dict.keys())
         prompts_dict = PromptBuilder.normalize_prompts_input(prompts, model_names, options)
         
-        # Auto-enhance prompts
-        for name, model_class in models_dict.items():
-            if name in prompts_dict:
-                prompts_dict[name] = PromptBuilder.enhance_prompt(
-                    prompts_dict[name], model_class, options
-                )
+        # Auto-enhance prompts (into a new dict: the normalized one may be the caller's)
+        prompts_dict = {
+            name: PromptBuilder.enhance_prompt(prompts_dict[name], model_class, options)
+            for name, model_class in models_dict.items()
+            if name in prompts_dict
+        }
         
-        return self._data_generator.generate_related_data(models_dict, prompts_dict, count)
+        return await self._data_generator.agenerate_related_data(
+            models_dict, prompts_dict, count, use_cache
+        )
     
     # Legacy and utility methods
     @property
@@ -181,9 +512,7 @@ class Weaver:
         """
         if isinstance(result, list):
             if format == "json":
-                return "[\n" + ",\n".join(
-                    item.model_dump_json(indent=2) for item in result
-                ) + "\n]"
+                return _dump_list_json(result)
             elif format == "detailed":
                 output = [f"Generated {len(result)} instances:\n"]
                 for i, item in enumerate(result, 1):
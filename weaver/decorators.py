@@ -1,9 +1,11 @@
 """Decorators and utilities to make Weaver more intuitive."""
 
-from typing import Type, Dict, Any, List, Optional, Callable
-from functools import wraps
+from typing import Type, Dict, Any, List, Optional, Callable, Tuple
+from functools import lru_cache, wraps
 from pydantic import BaseModel
 
+from .core.dependency_resolver import DependencyResolver
+
 
 def depends_on(*dependencies: str, **dependency_config):
     """
@@ -116,12 +118,24 @@ def batch_generate(count: int):
     return decorator
 
 
+@lru_cache(maxsize=256)
+def _field_model_names(model: Type[BaseModel]) -> Tuple[str, ...]:
+    """Lowercased names of the BaseModel classes used directly as field types (memoized per class)."""
+    return tuple(dict.fromkeys(
+        DependencyResolver.model_key(field_info.annotation)
+        for field_info in model.model_fields.values()
+        if isinstance(field_info.annotation, type) and issubclass(field_info.annotation, BaseModel)
+    ))
+
+
 class ModelRegistry:
     """Registry for managing model relationships and metadata."""
     
+    __slots__ = ("_models", "_relationships", "_metadata")
+    
     def __init__(self):
         self._models: Dict[str, Type[BaseModel]] = {}
-        self._relationships: Dict[str, List[str]] = {}
+        self._relationships: Dict[str, Tuple[str, ...]] = {}
         self._metadata: Dict[str, Dict[str, Any]] = {}
     
     def register(self, name: str, model: Type[BaseModel], **metadata):
@@ -130,17 +144,10 @@ class ModelRegistry:
         self._metadata[name] = metadata
         
         # Auto-detect relationships from model fields
-        relationships = []
-        for field_name, field_info in model.model_fields.items():
-            field_type = field_info.annotation
-            
-            # Check for other BaseModel types
-            if isinstance(field_type, type) and issubclass(field_type, BaseModel):
-                dep_name = field_type.__name__.lower()
-                if dep_name in self._models:
-                    relationships.append(dep_name)
-        
-        self._relationships[name] = relationships
+        models = self._models
+        self._relationships[name] = tuple(
+            dep_name for dep_name in _field_model_names(model) if dep_name in models
+        )
         return self
     
     def get_model(self, name: str) -> Type[BaseModel]:
@@ -149,9 +156,9 @@ class ModelRegistry:
             raise ValueError(f"Model '{name}' not registered")
         return self._models[name]
     
-    def get_dependencies(self, name: str) -> List[str]:
+    def get_dependencies(self, name: str) -> Tuple[str, ...]:
         """Get dependencies for a model."""
-        return self._relationships.get(name, [])
+        return self._relationships.get(name) or ()
     
     def get_metadata(self, name: str) -> Dict[str, Any]:
         """Get metadata for a model."""
@@ -194,13 +201,28 @@ def quick_generate(weaver, *model_specs, count: int = 1):
             model_class = spec
             prompt = f"Generate realistic {model_class.__name__} data"
         
-        name = model_class.__name__.lower()
+        name = DependencyResolver.model_key(model_class)
         models[name] = model_class
         prompts[name] = prompt
     
     return weaver.generate_related(models, prompts, count)
 
 
+def _age_range_text(age_range) -> str:
+    age_min, age_max = age_range
+    return f"Ages should be between {age_min} and {age_max}."
+
+
+# smart_prompt enhancements in output order; flags yield None when falsy
+_SMART_PROMPT_ENHANCEMENTS: Tuple[Tuple[str, Callable[[Any], Optional[str]]], ...] = (
+    ('realistic', lambda v: "Ensure all data is realistic and plausible." if v else None),
+    ('diverse', lambda v: "Generate diverse and varied instances." if v else None),
+    ('region', lambda v: f"Data should be appropriate for {v} region."),
+    ('age_range', _age_range_text),
+    ('industry', lambda v: f"Context should be relevant to {v} industry."),
+)
+
+
 def smart_prompt(base_prompt: str, **enhancements):
     """
     Create an enhanced prompt with common patterns.
@@ -220,21 +242,9 @@ def smart_prompt(base_prompt: str, **enhancements):
     """
     
     enhanced_parts = [base_prompt]
-    
-    if enhancements.get('realistic', False):
-        enhanced_parts.append("Ensure all data is realistic and plausible.")
-    
-    if enhancements.get('diverse', False):
-        enhanced_parts.append("Generate diverse and varied instances.")
-    
-    if 'region' in enhancements:
-        enhanced_parts.append(f"Data should be appropriate for {enhancements['region']} region.")
-    
-    if 'age_range' in enhancements:
-        age_min, age_max = enhancements['age_range']
-        enhanced_parts.append(f"Ages should be between {age_min} and {age_max}.")
-    
-    if 'industry' in enhancements:
-        enhanced_parts.append(f"Context should be relevant to {enhancements['industry']} industry.")
+    enhanced_parts.extend(filter(None, (
+        format_value(enhancements[key])
+        for key, format_value in _SMART_PROMPT_ENHANCEMENTS if key in enhancements
+    )))
     
     return "\n".join(enhanced_parts)
\ No newline at end of file
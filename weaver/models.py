@@ -1,58 +1,103 @@
 """Weaver model management using Pydantic AI models with providers."""
 
 import os
-from typing import Union, Optional, Any
-from pydantic_ai.models.openai import OpenAIChatModel
-from pydantic_ai.models.anthropic import AnthropicModel
-from pydantic_ai.models.google import GoogleModel as GeminiModel
-
-from pydantic_ai.providers.openai import OpenAIProvider
-from pydantic_ai.providers.anthropic import AnthropicProvider
-from pydantic_ai.providers.openrouter import OpenRouterProvider
+import atexit
+import asyncio
+import hashlib
+import importlib
+import importlib.util
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Union, Optional, Any, Dict, Tuple
+
+import httpx
+
+from . import _loop
 from .exceptions import WeaverError
 
-try:
-    from pydantic_ai.models.groq import GroqModel
-    from pydantic_ai.providers.groq import GroqProvider
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+if TYPE_CHECKING:
+    from pydantic_ai.models.openai import OpenAIChatModel
+    from pydantic_ai.models.anthropic import AnthropicModel
+    from pydantic_ai.models.google import GoogleModel as GeminiModel
+
+
+def _sdk_installed(name: str) -> bool:
+    """Check whether a provider SDK is installed without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+# Provider SDKs are imported on first use (see _load_class): importing every
+# one up front made `import weaver` take over a second
+GROQ_AVAILABLE = _sdk_installed("groq")
+GOOGLE_AVAILABLE = _sdk_installed("google.genai")
+# Enables httpx HTTP/2 support; httpx imports it itself when a client uses http2
+HTTP2_AVAILABLE = _sdk_installed("h2")
+
+# Connection pool sizing for the HTTP clients handed to providers. httpx
+# defaults to 100 connections, which throttles concurrent batch generation.
+DEFAULT_MAX_CONNECTIONS = 2000
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 1500
+DEFAULT_HTTP_TIMEOUT = 120.0
 
-try:
-    from pydantic_ai.providers.google import GoogleProvider
-    GOOGLE_AVAILABLE = True
-except ImportError:
-    GOOGLE_AVAILABLE = False
+# Providers whose SDK clients accept an injected HTTP client, with the SDK
+# package each one's client comes from (see _http_package)
+HTTPX_PROVIDERS = frozenset({"openai", "anthropic", "openrouter", "groq"})
+_PROVIDER_SDKS = {"openai": "openai", "anthropic": "anthropic", "openrouter": "openai", "groq": "groq"}
+
+# Clients created by Weaver, closed on interpreter shutdown
+_HTTP_CLIENTS: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+# Most shared providers kept; the least recently used is dropped beyond this
+# (Weavers already holding it keep working, new ones get a fresh pool)
+MAX_SHARED_PROVIDERS = 64
+
+# Providers shared between Weaver instances, keyed by
+# (provider name, API key hash, pool size), so repeated Weaver(...) calls
+# reuse warm connections instead of paying a new TLS handshake
+_SHARED_PROVIDERS: "OrderedDict[Tuple[str, str, Optional[int]], Any]" = OrderedDict()
+_SHARED_PROVIDERS_LOCK = threading.Lock()
+
+# HTTP clients behind the shared providers, keyed by (provider name, pool
+# size): every API key used with a provider talks to the same host, so they
+# share one connection pool (guarded by _SHARED_PROVIDERS_LOCK)
+_SHARED_HTTP_CLIENTS: Dict[Tuple[str, Optional[int]], Any] = {}
 
 # Type for all supported models
-WeaverModel = Union[OpenAIChatModel, AnthropicModel, GeminiModel]
+WeaverModel = Union["OpenAIChatModel", "AnthropicModel", "GeminiModel"]
 
-# Model configuration mapping provider to model class
-MODEL_CONFIG = {
+# Provider configuration used internally. Classes are given as
+# "module:attribute" paths and imported by _load_class when first needed; the
+# public MODEL_CONFIG (with class objects) is built from it on first access.
+_MODEL_CONFIG = {
     "openai": {
-        "model_class": OpenAIChatModel,
-        "provider_class": OpenAIProvider,
+        "model_class": "pydantic_ai.models.openai:OpenAIChatModel",
+        "provider_class": "pydantic_ai.providers.openai:OpenAIProvider",
         "env_key": "OPENAI_API_KEY",
         "default_model": "gpt-4-turbo",
         "provider_param": "openai"  # For OpenAIChatModel provider parameter
     },
     "anthropic": {
-        "model_class": AnthropicModel,
-        "provider_class": AnthropicProvider,
+        "model_class": "pydantic_ai.models.anthropic:AnthropicModel",
+        "provider_class": "pydantic_ai.providers.anthropic:AnthropicProvider",
         "env_key": "ANTHROPIC_API_KEY",
         "default_model": "claude-3-5-sonnet-20241022",
         "provider_param": None  # AnthropicModel uses provider instance directly
     },
     "gemini": {
-        "model_class": GeminiModel,
+        "model_class": "pydantic_ai.models.google:GoogleModel",
         "provider_class": None,  # Gemini uses API key directly
         "env_key": "GEMINI_API_KEY",
         "default_model": "gemini-1.5-pro",
         "provider_param": None
     },
     "openrouter": {
-        "model_class": OpenAIChatModel,  # OpenRouter uses OpenAI-compatible interface
-        "provider_class": OpenRouterProvider,
+        "model_class": "pydantic_ai.models.openai:OpenAIChatModel",  # OpenRouter uses OpenAI-compatible interface
+        "provider_class": "pydantic_ai.providers.openrouter:OpenRouterProvider",
         "env_key": "OPENROUTER_API_KEY", 
         "default_model": "google/gemini-2.5-flash-lite",
         "provider_param": None  # Provider instance passed directly
@@ -61,28 +106,193 @@ MODEL_CONFIG = {
 
 # Add optional providers if available
 if GROQ_AVAILABLE:
-    MODEL_CONFIG["groq"] = {
-        "model_class": GroqModel,
-        "provider_class": GroqProvider,
+    _MODEL_CONFIG["groq"] = {
+        "model_class": "pydantic_ai.models.groq:GroqModel",
+        "provider_class": "pydantic_ai.providers.groq:GroqProvider",
         "env_key": "GROQ_API_KEY",
         "default_model": "llama-3.1-70b-versatile",
         "provider_param": None
     }
 
 if GOOGLE_AVAILABLE:
-    MODEL_CONFIG["google"] = {
-        "model_class": GeminiModel,  # Use GeminiModel for Google
-        "provider_class": GoogleProvider,
+    _MODEL_CONFIG["google"] = {
+        "model_class": "pydantic_ai.models.google:GoogleModel",  # Use GeminiModel for Google
+        "provider_class": "pydantic_ai.providers.google:GoogleProvider",
         "env_key": "GOOGLE_AI_API_KEY",
         "default_model": "gemini-1.5-pro",
         "provider_param": None
     }
 
 
+def __getattr__(name: str) -> Any:
+    # MODEL_CONFIG maps each provider to its model and provider classes, so
+    # building it imports every installed provider SDK; only do so when it is
+    # actually read (`import weaver` alone stays fast)
+    if name == "MODEL_CONFIG":
+        config = {
+            provider_name: {
+                **entry,
+                "model_class": _load_class(entry["model_class"]),
+                "provider_class": _load_class(entry["provider_class"]),
+            }
+            for provider_name, entry in _MODEL_CONFIG.items()
+        }
+        return globals().setdefault("MODEL_CONFIG", config)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _model_config() -> Dict[str, Dict[str, Any]]:
+    """Return the provider configuration: MODEL_CONFIG once built (so edits to it apply), else the lazy table."""
+    return globals().get("MODEL_CONFIG", _MODEL_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def _load_class(path: Any) -> Any:
+    """Import a "module:attribute" class path (classes and None pass through)."""
+    if not isinstance(path, str):
+        return path
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _class_name(path: Any) -> Optional[str]:
+    """Return the class name of a configured class or class path without importing it."""
+    if path is None:
+        return None
+    return path.rpartition(":")[2] if isinstance(path, str) else path.__name__
+
+
+@lru_cache(maxsize=None)
+def _http_package(provider_name: str) -> Any:
+    """
+    Return the HTTP package (httpx or httpx2) whose client a provider's SDK expects.
+    
+    SDKs reject clients from the other package (newer Anthropic SDKs only
+    take httpx2, newer OpenAI ones deprecate httpx), so the client type is
+    read from the SDK's own default client class.
+    """
+    sdk = importlib.import_module(_PROVIDER_SDKS[provider_name])
+    default_client = getattr(sdk, "DefaultAsyncHttpxClient", None)
+    for base in getattr(default_client, "__mro__", ()):
+        package = base.__module__.partition(".")[0]
+        if package in ("httpx", "httpx2"):
+            return importlib.import_module(package)
+    return httpx
+
+
+def create_http_client(max_connections: Optional[int] = None, package: Any = httpx) -> Any:
+    """
+    Create an async HTTP client with connection-pool limits sized for batch generation.
+    
+    HTTP/2 is enabled when the optional ``h2`` package is installed, letting
+    concurrent requests multiplex over a single connection.
+    
+    Args:
+        max_connections: Maximum concurrent connections (uses DEFAULT_MAX_CONNECTIONS if not specified)
+        package: HTTP package to build the client with (httpx or httpx2, see _http_package)
+        
+    Returns:
+        package.AsyncClient that is closed automatically on interpreter shutdown
+    """
+    max_connections = max_connections or DEFAULT_MAX_CONNECTIONS
+    client = package.AsyncClient(
+        limits=package.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_connections, DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+        ),
+        timeout=package.Timeout(DEFAULT_HTTP_TIMEOUT, connect=5.0),
+        http2=HTTP2_AVAILABLE,
+    )
+    _HTTP_CLIENTS.add(client)
+    return client
+
+
+def get_shared_provider(
+    provider_name: str,
+    api_key: str,
+    max_connections: Optional[int] = None
+) -> Any:
+    """
+    Return the process-wide provider instance for an httpx-based provider.
+    
+    Providers are built once per (provider, API key, pool size) and reused,
+    and all providers of one name and pool size share one HTTP client, so
+    every Weaver talking to the same host shares one connection pool. The
+    pool is only used on Weaver's background event loop (pooled connections
+    are bound to the loop that opened them), where Weaver runs all of its
+    calls; code driving the provider directly must do the same, e.g. through
+    weaver._loop.run_async. At most MAX_SHARED_PROVIDERS are kept, least
+    recently used first out. Thread-safe.
+    
+    Args:
+        provider_name: Provider name from HTTPX_PROVIDERS
+        api_key: API key for the provider (only its hash is kept as the cache key)
+        max_connections: HTTP connection-pool size
+        
+    Returns:
+        Pydantic AI provider instance backed by a pooled HTTP client
+    """
+    key = (provider_name, hashlib.sha256(api_key.encode("utf-8")).hexdigest(), max_connections)
+    
+    with _SHARED_PROVIDERS_LOCK:
+        provider = _SHARED_PROVIDERS.get(key)
+        if provider is None or provider.client.is_closed():
+            provider = _load_class(_model_config()[provider_name]["provider_class"])(
+                api_key=api_key,
+                http_client=_shared_http_client(provider_name, max_connections)
+            )
+            _SHARED_PROVIDERS[key] = provider
+        
+        _SHARED_PROVIDERS.move_to_end(key)
+        if len(_SHARED_PROVIDERS) > MAX_SHARED_PROVIDERS:
+            _SHARED_PROVIDERS.popitem(last=False)
+        return provider
+
+
+def _shared_http_client(provider_name: str, max_connections: Optional[int]) -> Any:
+    """Return the pooled client shared by a provider's instances (caller holds _SHARED_PROVIDERS_LOCK)."""
+    key = (provider_name, max_connections)
+    client = _SHARED_HTTP_CLIENTS.get(key)
+    if client is None or client.is_closed:
+        client = _SHARED_HTTP_CLIENTS[key] = create_http_client(max_connections, _http_package(provider_name))
+    return client
+
+
+@atexit.register
+def _close_http_clients() -> None:
+    """Release pooled connections held by clients created in this process."""
+    clients = [client for client in _HTTP_CLIENTS if not client.is_closed]
+    if not clients:
+        return
+    
+    async def close_all():
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+    
+    try:
+        if _loop.is_started():
+            # Connections belong to the loop that opened them
+            _loop.run_sync(close_all(), timeout=5)
+        else:
+            asyncio.run(close_all())
+    except Exception:
+        # Best effort only: the loop that opened the connections may be gone
+        pass
+
+
+def resolve_api_key(provider_name: str, api_key: Optional[str] = None) -> Optional[str]:
+    """Return api_key, or the provider's environment variable if not given."""
+    if api_key:
+        return api_key
+    config = _model_config().get(provider_name)
+    return os.getenv(config["env_key"]) if config else None
+
+
 def create_model(
     provider_name: str,
     model_name: Optional[str] = None,
     api_key: Optional[str] = None,
+    max_connections: Optional[int] = None,
+    http_client: Optional[Any] = None,
     **kwargs
 ) -> WeaverModel:
     """
@@ -92,6 +302,8 @@ def create_model(
         provider_name: Provider name (openai, anthropic, gemini, openrouter, etc.)
         model_name: Model name (uses default if not specified)
         api_key: API key (uses environment variable if not specified)
+        max_connections: HTTP connection-pool size for httpx-based providers
+        http_client: Custom httpx/httpx2 AsyncClient of the type the provider SDK expects (e.g. with a tuned transport); overrides max_connections
         **kwargs: Additional model parameters
         
     Returns:
@@ -100,16 +312,15 @@ def create_model(
     Raises:
         WeaverError: If provider not supported or configuration invalid
     """
-    if provider_name not in MODEL_CONFIG:
-        available = ", ".join(MODEL_CONFIG.keys())
+    model_config = _model_config()
+    if provider_name not in model_config:
+        available = ", ".join(model_config.keys())
         raise WeaverError(f"Provider '{provider_name}' not supported. Available: {available}")
     
-    config = MODEL_CONFIG[provider_name]
-    model_class = config["model_class"]
-    provider_class = config["provider_class"]
+    config = model_config[provider_name]
     
     # Get API key
-    final_api_key = api_key or os.getenv(config["env_key"])
+    final_api_key = resolve_api_key(provider_name, api_key)
     if not final_api_key:
         raise WeaverError(f"API key required for {provider_name}. Set {config['env_key']} or pass api_key parameter")
     
@@ -117,18 +328,28 @@ def create_model(
     final_model_name = model_name or config["default_model"]
     
     try:
+        # Import the provider SDK on first use
+        model_class = _load_class(config["model_class"])
+        provider_class = _load_class(config["provider_class"])
+        
+        if provider_name in HTTPX_PROVIDERS:
+            # Reuse the shared pooled provider unless a custom client was given
+            if http_client is None:
+                provider = get_shared_provider(provider_name, final_api_key, max_connections)
+            else:
+                provider = provider_class(api_key=final_api_key, http_client=http_client)
+        
         # Create model based on provider requirements
         if provider_name == "openai":
-            # OpenAI uses provider parameter as string
+            # OpenAI uses provider instance so the pooled HTTP client is used
             return model_class(
                 model_name=final_model_name,
-                provider="openai",
+                provider=provider,
                 **kwargs
             )
         
         elif provider_name == "anthropic":
             # Anthropic uses provider instance
-            provider = provider_class(api_key=final_api_key)
             return model_class(
                 model_name=final_model_name,
                 provider=provider,
@@ -145,8 +366,7 @@ def create_model(
         
         elif provider_name == "openrouter":
             # OpenRouter uses OpenAIChatModel with OpenRouterProvider
-            provider = provider_class(api_key=final_api_key)
-            return OpenAIChatModel(
+            return model_class(
                 model_name=final_model_name,
                 provider=provider,
                 **kwargs
@@ -154,8 +374,7 @@ def create_model(
         
         elif provider_name == "groq" and GROQ_AVAILABLE:
             # Groq uses provider instance
-            provider = provider_class(api_key=final_api_key)
-            return GroqModel(
+            return model_class(
                 model_name=final_model_name,
                 provider=provider,
                 **kwargs
@@ -183,26 +402,28 @@ def create_model(
 
 def get_available_providers() -> list[str]:
     """Get list of available providers."""
-    return list(MODEL_CONFIG.keys())
+    return list(_model_config().keys())
 
 
 def get_default_model(provider_name: str) -> str:
     """Get default model for a provider."""
-    if provider_name not in MODEL_CONFIG:
+    model_config = _model_config()
+    if provider_name not in model_config:
         raise WeaverError(f"Provider '{provider_name}' not found")
-    return MODEL_CONFIG[provider_name]["default_model"]
+    return model_config[provider_name]["default_model"]
 
 
 def get_model_info(provider_name: str) -> dict[str, Any]:
     """Get information about a provider's model configuration."""
-    if provider_name not in MODEL_CONFIG:
+    model_config = _model_config()
+    if provider_name not in model_config:
         raise WeaverError(f"Provider '{provider_name}' not found")
     
-    config = MODEL_CONFIG[provider_name]
+    config = model_config[provider_name]
     return {
         "name": provider_name,
-        "model_class": config["model_class"].__name__,
-        "provider_class": config["provider_class"].__name__ if config["provider_class"] else None,
+        "model_class": _class_name(config["model_class"]),
+        "provider_class": _class_name(config["provider_class"]),
         "default_model": config["default_model"],
         "env_key": config["env_key"],
         "available": config["env_key"] in os.environ